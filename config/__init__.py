@@ -2,18 +2,27 @@
 Módulo config - Configurações do projeto
 """
 
-from .settings import (
-    DEFAULT_CONFIG,
-    XML_TYPE_CONFIGS,
-    CLI_CONFIG,
-    get_config,
-    ensure_directories
-)
+import importlib
 
 __all__ = [
     "DEFAULT_CONFIG",
-    "XML_TYPE_CONFIGS", 
+    "XML_TYPE_CONFIGS",
     "CLI_CONFIG",
     "get_config",
-    "ensure_directories"
-]
\ No newline at end of file
+    "ensure_directories",
+]
+
+
+def __getattr__(name):
+    """Carrega os atributos de settings sob demanda (PEP 562)"""
+    if name not in __all__:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    module = importlib.import_module(".settings", __name__)
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
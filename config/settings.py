@@ -2,8 +2,13 @@
 Configurações do projeto XML to JSON Converter
 """
 
+import fnmatch
 import os
+import re
+import sys
+from functools import lru_cache
 from pathlib import Path
+from types import MappingProxyType
 
 # Diretórios do projeto
 PROJECT_ROOT = Path(__file__).parent.parent
@@ -13,6 +18,79 @@ EXAMPLES_DIR = PROJECT_ROOT / "examples"
 TESTS_DIR = PROJECT_ROOT / "tests"
 DOCS_DIR = PROJECT_ROOT / "docs"
 
+# Backend de serialização JSON: usa orjson/ujson (extra "performance")
+# quando instalado; caso contrário, cai para o json da stdlib.
+try:
+    import orjson as _json_backend
+
+    JSON_BACKEND = 'orjson'
+except ImportError:
+    try:
+        import ujson as _json_backend
+
+        JSON_BACKEND = 'ujson'
+    except ImportError:
+        import json as _json_backend
+
+        JSON_BACKEND = 'json'
+
+
+def dump_json_bytes(data, indent=2):
+    """
+    Serializa dados em JSON (bytes UTF-8) com o backend mais rápido disponível
+
+    Args:
+        data: Dados para serializar
+        indent: Indentação (0 ou None gera JSON compacto)
+
+    Returns:
+        bytes com o JSON serializado
+    """
+    if JSON_BACKEND == 'orjson':
+        option = _json_backend.OPT_INDENT_2 if indent else 0
+        return _json_backend.dumps(data, option=option)
+
+    if JSON_BACKEND == 'ujson':
+        return _json_backend.dumps(
+            data,
+            indent=indent or 0,
+            ensure_ascii=False,
+            escape_forward_slashes=False,
+        ).encode('utf-8')
+
+    return _json_backend.dumps(
+        data,
+        indent=indent or None,
+        ensure_ascii=False,
+        separators=(',', ': ') if indent else (',', ':'),
+    ).encode('utf-8')
+
+
+def write_json_bytes(path, payload):
+    """
+    Grava JSON já serializado com uma única escrita em fd cru
+
+    Evita a dupla bufferização da camada de texto: o payload (bytes de
+    dump_json_bytes) vai ao kernel em um write só.
+
+    Args:
+        path: Caminho do arquivo de saída
+        payload: bytes com o JSON serializado
+
+    Returns:
+        True se gravou com sucesso
+    """
+    try:
+        fd = os.open(os.fspath(path), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.write(fd, payload)
+        finally:
+            os.close(fd)
+        return True
+    except OSError:
+        return False
+
+
 # Configurações padrão do conversor
 DEFAULT_CONFIG = {
     # Configurações XML
@@ -26,6 +104,7 @@ DEFAULT_CONFIG = {
     'ensure_ascii': False,
     'sort_keys': False,
     'separators': (',', ': '),
+    'json_backend': JSON_BACKEND,
     
     # Configurações de arquivo
     'create_output_dir': True,
@@ -49,17 +128,53 @@ DEFAULT_CONFIG = {
     'validate_nfe_structure': True
 }
 
-# Extensões de arquivo suportadas
-SUPPORTED_XML_EXTENSIONS = ['.xml', '.nfe', '.cte', '.mdfe']
+# Extensões de arquivo suportadas (frozenset de strings internadas:
+# checagem "ext in SUPPORTED_XML_EXTENSIONS" vira hash + comparação de ponteiro)
+SUPPORTED_XML_EXTENSIONS = frozenset(
+    sys.intern(ext) for ext in ('.xml', '.nfe', '.cte', '.mdfe')
+)
 OUTPUT_JSON_EXTENSION = '.json'
 
 # Padrões de arquivo para busca
-DEFAULT_XML_PATTERNS = [
+DEFAULT_XML_PATTERNS = (
     '*.xml',
     '*.nfe',
     '*.cte',
     '*.mdfe'
-]
+)
+
+# Matcher pré-compilado equivalente aos padrões acima
+_PATTERN_RE = re.compile('|'.join(fnmatch.translate(p) for p in DEFAULT_XML_PATTERNS))
+
+
+def match_xml(name):
+    """
+    Verifica se um nome de arquivo casa com os padrões XML suportados
+
+    Args:
+        name: Nome do arquivo (sem diretório)
+
+    Returns:
+        True se o nome casa com algum padrão suportado
+    """
+    return _PATTERN_RE.match(name) is not None
+
+
+def is_nfe_file(path):
+    """
+    Heurística barata para identificar arquivo de NFe pelo nome
+
+    Olha apenas a extensão e o nome-base, sem alocar o caminho inteiro
+    em minúsculas (e sem falsos positivos vindos de diretórios).
+
+    Args:
+        path: Caminho do arquivo
+
+    Returns:
+        True se o nome sugere uma NFe
+    """
+    stem, ext = os.path.splitext(os.path.basename(os.fspath(path)))
+    return ext.lower() == '.nfe' or 'nfe' in stem.lower()
 
 # Configurações de logging
 LOGGING_CONFIG = {
@@ -112,6 +227,21 @@ XML_TYPE_CONFIGS = {
     }
 }
 
+# Congela as configurações estruturais: tuplas de nomes internados para
+# comparação rápida de tags (ponteiro antes de strcmp) e MappingProxyType
+# para leitura compartilhada sem risco de mutação acidental.
+XML_TYPE_CONFIGS = MappingProxyType({
+    xml_type: MappingProxyType({
+        **type_config,
+        'required_elements': tuple(
+            sys.intern(element) for element in type_config['required_elements']
+        ),
+    })
+    for xml_type, type_config in XML_TYPE_CONFIGS.items()
+})
+
+DEFAULT_CONFIG = MappingProxyType(DEFAULT_CONFIG)
+
 # Configurações de interface CLI
 CLI_CONFIG = {
     'show_progress': True,
@@ -134,54 +264,92 @@ ERROR_MESSAGES = {
 
 # Configurações de desenvolvimento
 DEV_CONFIG = {
-    'debug_mode': os.getenv('DEBUG', 'False').lower() == 'true',
     'profiling_enabled': False,
     'test_data_dir': TESTS_DIR / 'sample_data',
     'generate_test_files': False
 }
 
-# Configurações de produção
+
+@lru_cache(maxsize=1)
+def is_debug():
+    """
+    Resolve o modo debug a partir do ambiente (uma vez, sob demanda)
+
+    Lido apenas no primeiro uso, então testes podem ajustar a variável
+    DEBUG antes da primeira leitura (ou chamar is_debug.cache_clear()).
+
+    Returns:
+        True se a variável de ambiente DEBUG está ativa
+    """
+    return os.getenv('DEBUG', 'False').lower() == 'true'
+
+# Configurações de produção (somente chaves efetivamente consumidas;
+# 'json_backend' já vem detectado em DEFAULT_CONFIG)
 PROD_CONFIG = {
-    'optimize_memory': True,
-    'enable_caching': False,
-    'max_workers': 4,
-    'error_reporting': True
+    'jobs': PERFORMANCE_CONFIG['max_concurrent_files'],
 }
 
 # Função para obter configuração baseada no ambiente
-def get_config():
+@lru_cache(maxsize=1)
+def _build_config():
     """
-    Retorna configuração baseada no ambiente
-    
+    Monta a configuração do ambiente (executa no máximo uma vez por processo)
+
     Returns:
-        Dict com configurações
+        MappingProxyType com configurações (somente leitura)
     """
-    config = DEFAULT_CONFIG.copy()
-    
-    # Aplica configurações específicas do ambiente
-    if DEV_CONFIG['debug_mode']:
-        config.update({
+    # Uma única mesclagem C-level em vez de copy() + update()
+    if is_debug():
+        config = {
+            **DEFAULT_CONFIG,
             'indent_json': 4,
             'validate_before_convert': True,
-            'backup_original': True
-        })
+            'backup_original': True,
+        }
     else:
-        config.update(PROD_CONFIG)
-        
-    return config
+        config = {**DEFAULT_CONFIG, **PROD_CONFIG}
+
+    return MappingProxyType(config)
+
+
+def get_config():
+    """
+    Retorna configuração baseada no ambiente
+
+    O resultado é montado uma única vez e reutilizado; use
+    `_build_config.cache_clear()` (e `is_debug.cache_clear()`) em
+    testes que alteram o ambiente.
+
+    Returns:
+        Mapping somente leitura com configurações
+    """
+    return _build_config()
 
 # Função para criar diretórios necessários
-def ensure_directories():
-    """Cria diretórios necessários do projeto"""
+@lru_cache(maxsize=1)
+def _ensure_directories_impl():
+    """Cria os diretórios do projeto (roda no máximo uma vez por processo)"""
     directories = [
         OUTPUT_DIR,
         PROJECT_ROOT / 'logs',
         TESTS_DIR / 'sample_data'
     ]
-    
+
     for directory in directories:
         directory.mkdir(parents=True, exist_ok=True)
 
+    return True
+
+
+def ensure_directories():
+    """Cria diretórios necessários do projeto"""
+    _ensure_directories_impl()
+
+
+def reset_ensure_cache():
+    """Permite que testes forcem nova criação dos diretórios"""
+    _ensure_directories_impl.cache_clear()
+
 # Executa setup inicial
 if __name__ == "__main__":
     ensure_directories()
@@ -189,4 +357,4 @@ if __name__ == "__main__":
     print(f"📁 Projeto: {PROJECT_ROOT}")
     print(f"📁 Saída: {OUTPUT_DIR}")
     print(f"📁 Testes: {TESTS_DIR}")
-    print(f"🔧 Debug: {DEV_CONFIG['debug_mode']}")
\ No newline at end of file
+    print(f"🔧 Debug: {is_debug()}")
\ No newline at end of file
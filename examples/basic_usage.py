@@ -1,15 +1,13 @@
 #!/usr/bin/env python3
 """
 Exemplo básico de uso do XML to JSON Converter
+
+Requer o pacote instalado no ambiente (``pip install -e .``).
 """
 
-import sys
 from pathlib import Path
 
-# Adiciona src ao path
-project_root = Path(__file__).parent.parent
-sys.path.insert(0, str(project_root / "src"))
-
+from config.settings import is_nfe_file
 from src.core.converter import XMLToJSONConverter
 from src.models.nfe_extractor import NFEExtractor
 from src.utils.formatters import XMLFormatter
@@ -24,31 +22,31 @@ def exemplo_basico():
     # Cria instância do conversor
     converter = XMLToJSONConverter()
     
-    # Arquivo XML de exemplo (substitua pelo seu arquivo)
-    xml_file = "exemplo.xml"  # Coloque seu arquivo XML aqui
-    json_file = "exemplo_convertido.json"
-    
+    # Caminhos resolvidos uma única vez (substitua pelo seu arquivo)
+    xml_file = Path("exemplo.xml")  # Coloque seu arquivo XML aqui
+    json_file = Path("exemplo_convertido.json")
+
     # Verifica se arquivo existe
-    if not Path(xml_file).exists():
+    if not xml_file.exists():
         print(f"❌ Arquivo não encontrado: {xml_file}")
         print("💡 Coloque um arquivo XML no mesmo diretório deste exemplo")
         return
-    
+
     print(f"📁 Convertendo: {xml_file}")
-    
+
     # Converte arquivo
     result = converter.convert_file(xml_file, json_file)
-    
+
     if result:
         print(f"✅ Conversão concluída: {json_file}")
-        
+
         # Mostra algumas informações
         formatter = XMLFormatter()
-        file_size = Path(json_file).stat().st_size
+        file_size = json_file.stat().st_size
         print(f"📏 Tamanho do JSON: {formatter.get_size_formatted(file_size)}")
         
         # Se for NFe, extrai informações específicas
-        if "nfe" in str(xml_file).lower():
+        if is_nfe_file(xml_file):
             print("\n📋 Extraindo informações da NFe...")
             nfe_extractor = NFEExtractor()
             nfe_info = nfe_extractor.extract_nfe_info(result)
@@ -150,10 +148,10 @@ def exemplo_batch():
     print("📦 Exemplo - Conversão em Lote")
     print("=" * 60)
     
-    # Diretório com XMLs (substitua pelo seu diretório)
-    xml_directory = "xml_files"  # Crie este diretório e coloque XMLs
-    
-    if not Path(xml_directory).exists():
+    # Diretório com XMLs, resolvido uma única vez (substitua pelo seu)
+    xml_directory = Path("xml_files")  # Crie este diretório e coloque XMLs
+
+    if not xml_directory.exists():
         print(f"❌ Diretório não encontrado: {xml_directory}")
         print("💡 Crie um diretório 'xml_files' e coloque alguns arquivos XML")
         return
@@ -4,12 +4,6 @@ Ponto de entrada principal do projeto
 """
 
 import sys
-import os
-from pathlib import Path
-
-# Adiciona o diretório src ao path para permitir imports
-project_root = Path(__file__).parent
-sys.path.insert(0, str(project_root / "src"))
 
 from src.cli.interface import main as cli_main
 from src.core.converter import XMLToJSONConverter
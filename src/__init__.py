@@ -3,6 +3,8 @@ XML to JSON Converter
 Conversor profissional de XML para JSON com suporte específico para NFe brasileira
 """
 
+import importlib
+
 __version__ = "1.0.0"
 __author__ = "XML to JSON Converter Team"
 __email__ = "dev@xmltojson.com"
@@ -11,13 +13,6 @@ __description__ = (
     "Conversor profissional de XML para JSON com suporte específico para NFe brasileira"
 )
 
-# Imports principais para facilitar uso
-from .core.converter import XMLToJSONConverter
-from .models.nfe_extractor import NFEExtractor
-from .utils.validators import XMLValidator
-from .utils.formatters import XMLFormatter
-from .utils.file_handler import FileHandler
-
 # Lista de exports públicos
 __all__ = [
     "XMLToJSONConverter",
@@ -27,6 +22,37 @@ __all__ = [
     "FileHandler",
 ]
 
+# Mapeamento de exports para seus submódulos (carregados sob demanda)
+_LAZY_IMPORTS = {
+    "XMLToJSONConverter": ".core.converter",
+    "NFEExtractor": ".models.nfe_extractor",
+    "XMLValidator": ".utils.validators",
+    "XMLFormatter": ".utils.formatters",
+    "FileHandler": ".utils.file_handler",
+}
+
+
+def __getattr__(name):
+    """
+    Carrega classes públicas sob demanda (PEP 562)
+
+    Evita importar parsers e extratores no `import src` quando apenas
+    metadados (ex: __version__) são necessários.
+    """
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    module = importlib.import_module(module_name, __name__)
+    value = getattr(module, name)
+    globals()[name] = value  # Cache para próximos acessos
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
+
+
 # Configuração de logging básica
 import logging
 
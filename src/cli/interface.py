@@ -2,20 +2,39 @@
 Interface de linha de comando para o conversor XML to JSON
 """
 
+from __future__ import annotations
+
 import argparse
+import functools
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
+
+from config.settings import PERFORMANCE_CONFIG
+
+from ..core.settings import ConversionSettings
+from ..utils.file_discovery import iter_xml_files
+
+if TYPE_CHECKING:
+    from ..core.converter import XMLToJSONConverter
+    from ..utils.formatters import XMLFormatter
 
-from ..core.converter import XMLToJSONConverter
-from ..models.nfe_extractor import NFEExtractor
-from ..utils.formatters import XMLFormatter
+# Imports pesados (parser, validador, extrator) são feitos dentro das
+# funções que os usam, para que --help / --version não paguem esse custo.
 
 
+@functools.lru_cache(maxsize=1)
 def create_parser() -> argparse.ArgumentParser:
     """
     Cria parser de argumentos da linha de comando
 
+    O parser é construído uma única vez por processo; chamadas repetidas
+    (testes ou uso embutido de main()) reutilizam a mesma instância.
+    Use create_parser.cache_clear() para forçar reconstrução.
+
     Returns:
         ArgumentParser configurado
     """
@@ -55,6 +74,14 @@ def create_parser() -> argparse.ArgumentParser:
         help="Padrão de arquivos para busca (padrão: *.xml)",
     )
 
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=PERFORMANCE_CONFIG["max_concurrent_files"],
+        help="Número de processos paralelos na conversão em lote "
+        f"(padrão: {PERFORMANCE_CONFIG['max_concurrent_files']})",
+    )
+
     # Configurações de conversão
     parser.add_argument(
         "--no-clean-namespaces",
@@ -113,21 +140,22 @@ def print_header():
     print("=" * 60)
 
 
-def print_file_info(file_path: Path, formatter: XMLFormatter):
+def print_file_info(file_path: str, formatter: XMLFormatter, stat_result=None):
     """
     Imprime informações do arquivo
 
     Args:
         file_path: Caminho do arquivo
         formatter: Instância do formatador
+        stat_result: Resultado de os.stat já obtido (evita novo syscall)
     """
     try:
-        stat = file_path.stat()
-        size_formatted = formatter.get_size_formatted(stat.st_size)
+        stat_result = stat_result or os.stat(file_path)
+        size_formatted = formatter.get_size_formatted(stat_result.st_size)
 
-        print(f"📁 Arquivo: {file_path.name}")
+        print(f"📁 Arquivo: {os.path.basename(file_path)}")
         print(f"📏 Tamanho: {size_formatted}")
-        print(f"📅 Modificado: {stat.st_mtime}")
+        print(f"📅 Modificado: {stat_result.st_mtime}")
 
     except Exception as e:
         print(f"❌ Erro ao obter informações do arquivo: {e}")
@@ -141,28 +169,28 @@ def handle_single_file(args, converter: XMLToJSONConverter):
         args: Argumentos da linha de comando
         converter: Instância do conversor
     """
-    input_path = Path(args.input)
+    input_path = os.fspath(args.input)
 
-    if not input_path.exists():
+    # Um único stat cobre existência e informações verbose
+    try:
+        input_stat = os.stat(input_path)
+    except OSError:
         print(f"❌ Arquivo não encontrado: {input_path}")
         return False
 
     if args.verbose:
-        print_file_info(input_path, XMLFormatter())
+        from ..utils.formatters import XMLFormatter
+
+        print_file_info(input_path, XMLFormatter(), input_stat)
 
     # Define arquivo de saída
     if args.output:
-        output_path = Path(args.output)
+        output_path = os.fspath(args.output)
     else:
-        output_path = input_path.with_suffix(".json")
+        output_path = _swap_ext(input_path)
 
     # Configurações de conversão
-    conversion_settings = {
-        "clean_namespaces": not args.no_clean_namespaces,
-        "preserve_attributes": not args.no_attributes,
-        "auto_type_conversion": not args.no_type_conversion,
-        "indent_json": 0 if args.minimize else args.indent,
-    }
+    conversion_settings = _settings_from_args(args)
 
     # Apenas validação
     if args.validate_only:
@@ -178,18 +206,20 @@ def handle_single_file(args, converter: XMLToJSONConverter):
         return is_valid
 
     # Conversão
-    print(f"🔄 Convertendo: {input_path.name}")
+    print(f"🔄 Convertendo: {os.path.basename(input_path)}")
 
     if args.backup:
         converter.file_handler.backup_file(input_path)
 
-    result = converter.convert_file(input_path, output_path, **conversion_settings)
+    result = converter.convert_file(input_path, output_path, settings=conversion_settings)
 
     if result:
         print(f"✅ Conversão concluída: {output_path}")
 
         # Informações específicas de NFe
         if args.nfe_info:
+            from ..models.nfe_extractor import NFEExtractor
+
             nfe_extractor = NFEExtractor()
             nfe_data = nfe_extractor.extract_nfe_info(result)
             if nfe_data:
@@ -200,18 +230,76 @@ def handle_single_file(args, converter: XMLToJSONConverter):
         # Estatísticas
         if args.stats:
             stats = converter.get_converter_stats()
-        print("\n📊 Estatísticas:")
-        val_count = stats.get("validator", {}).get("validations_performed", 0)
-        print(f"   • Validações: {val_count}")
-        parse_count = stats.get("parser", {}).get("parsed_elements", 0)
-        print(f"   • Elementos processados: {parse_count}")
+            print("\n📊 Estatísticas:")
+            val_count = stats.get("validator", {}).get("validations_performed", 0)
+            print(f"   • Validações: {val_count}")
+            parse_count = stats.get("parser", {}).get("parsed_elements", 0)
+            print(f"   • Elementos processados: {parse_count}")
 
         return True
     else:
-        print(f"❌ Erro na conversão de {input_path.name}")
+        print(f"❌ Erro na conversão de {os.path.basename(input_path)}")
         return False
 
 
+def _swap_ext(path: str, new_ext: str = ".json") -> str:
+    """
+    Troca a extensão de um caminho com operação pura de string
+
+    Mais barato que reconstruir um Path com with_suffix em laços de lote.
+
+    Args:
+        path: Caminho do arquivo
+        new_ext: Nova extensão (com ponto)
+
+    Returns:
+        Caminho com a extensão trocada
+    """
+    i = path.rfind(".")
+    if i > path.rfind(os.sep):
+        return path[:i] + new_ext
+    return path + new_ext
+
+
+def _settings_from_args(args) -> ConversionSettings:
+    """
+    Monta as configurações de conversão a partir dos argumentos da CLI
+
+    Args:
+        args: Argumentos da linha de comando
+
+    Returns:
+        ConversionSettings imutável
+    """
+    return ConversionSettings(
+        clean_namespaces=not args.no_clean_namespaces,
+        preserve_attributes=not args.no_attributes,
+        auto_type_conversion=not args.no_type_conversion,
+        indent_json=0 if args.minimize else args.indent,
+    )
+
+
+def _convert_one(xml_file: str, json_file: str, settings: ConversionSettings) -> bool:
+    """
+    Converte um único arquivo (executado em um processo worker)
+
+    Precisa ser função de módulo para ser picklable; cada worker cria
+    seu próprio conversor.
+
+    Args:
+        xml_file: Caminho do arquivo XML
+        json_file: Caminho do arquivo JSON de saída
+        settings: Configurações de conversão
+
+    Returns:
+        True se a conversão foi bem-sucedida
+    """
+    from ..core.converter import XMLToJSONConverter
+
+    converter = XMLToJSONConverter()
+    return converter.convert_file(xml_file, json_file, settings=settings) is not None
+
+
 def handle_directory(args, converter: XMLToJSONConverter):
     """
     Processa diretório com múltiplos arquivos
@@ -220,27 +308,54 @@ def handle_directory(args, converter: XMLToJSONConverter):
         args: Argumentos da linha de comando
         converter: Instância do conversor
     """
-    input_dir = Path(args.directory)
+    input_dir = os.fspath(args.directory)
 
-    if not input_dir.exists() or not input_dir.is_dir():
+    if not os.path.isdir(input_dir):
         print(f"❌ Diretório não encontrado: {input_dir}")
         return False
 
     print(f"📁 Processando diretório: {input_dir}")
 
     # Configurações de conversão
-    conversion_settings = {
-        "clean_namespaces": not args.no_clean_namespaces,
-        "preserve_attributes": not args.no_attributes,
-        "auto_type_conversion": not args.no_type_conversion,
-        "indent_json": 0 if args.minimize else args.indent,
-    }
-
-    # Conversão em lote
-    results = converter.convert_batch(
-        input_dir, pattern=args.pattern, **conversion_settings
+    conversion_settings = _settings_from_args(args)
+
+    # Pré-varredura única do diretório (respeita -r/--recursive)
+    xml_files = sorted(
+        path
+        for path, _ in iter_xml_files(input_dir, args.pattern, args.recursive)
     )
 
+    results = {}
+    if not xml_files:
+        print(f"⚠️ Nenhum arquivo XML encontrado em: {input_dir}")
+    else:
+        output_dir = os.path.join(input_dir, "converted")
+        os.makedirs(output_dir, exist_ok=True)
+
+        json_files = [
+            os.path.join(output_dir, _swap_ext(os.path.basename(f)))
+            for f in xml_files
+        ]
+
+        jobs = max(1, args.jobs)
+        if jobs > 1 and len(xml_files) > 1:
+            # Cada arquivo é independente: paraleliza entre processos
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                statuses = executor.map(
+                    _convert_one,
+                    xml_files,
+                    json_files,
+                    repeat(conversion_settings),
+                    chunksize=8,
+                )
+                results = dict(zip(xml_files, statuses))
+        else:
+            for xml_file, json_file in zip(xml_files, json_files):
+                result = converter.convert_file(
+                    xml_file, json_file, settings=conversion_settings
+                )
+                results[xml_file] = result is not None
+
     # Relatório
     success_count = sum(results.values())
     total_count = len(results)
@@ -251,10 +366,13 @@ def handle_directory(args, converter: XMLToJSONConverter):
     print(f"   • Falhas: {total_count - success_count}")
 
     if args.verbose and results:
-        print(f"\n📄 Detalhes:")
-        for file_path, success in results.items():
-            status = "✅" if success else "❌"
-            print(f"   {status} {Path(file_path).name}")
+        # Uma única escrita em stdout em vez de um print por arquivo
+        lines = ["\n📄 Detalhes:\n"]
+        lines.extend(
+            f"   {'✅' if success else '❌'} {os.path.basename(file_path)}\n"
+            for file_path, success in results.items()
+        )
+        sys.stdout.write("".join(lines))
 
     # Estatísticas gerais
     if args.stats:
@@ -291,7 +409,9 @@ def main():
 
     print_header()
 
-    # Cria instância do conversor
+    # Cria instância do conversor (import adiado até aqui)
+    from ..core.converter import XMLToJSONConverter
+
     converter = XMLToJSONConverter()
 
     try:
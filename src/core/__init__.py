@@ -2,7 +2,27 @@
 Módulo core - Funcionalidades principais de conversão
 """
 
-from .converter import XMLToJSONConverter
-from .xml_parser import XMLParser
+import importlib
 
 __all__ = ["XMLToJSONConverter", "XMLParser"]
+
+_LAZY_IMPORTS = {
+    "XMLToJSONConverter": ".converter",
+    "XMLParser": ".xml_parser",
+}
+
+
+def __getattr__(name):
+    """Carrega as classes do módulo sob demanda (PEP 562)"""
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    module = importlib.import_module(module_name, __name__)
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
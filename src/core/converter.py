@@ -3,17 +3,65 @@ Módulo principal de conversão XML para JSON
 """
 
 import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Optional, Union
-from collections import OrderedDict
+
+from config.settings import dump_json_bytes, write_json_bytes
 
 from ..utils.file_handler import FileHandler
 from ..utils.validators import XMLValidator
-from ..utils.formatters import XMLFormatter
-from .xml_parser import XMLParser
+from ..utils.formatters import XMLFormatter, _strip_ns
+from .settings import ConversionSettings
+from .xml_parser import USE_EXPAT_DEFAULT, XMLParser
 
 logger = logging.getLogger(__name__)
 
+# Acima deste tamanho o arquivo é convertido via iterparse (streaming),
+# evitando carregar o documento inteiro em memória duas vezes.
+STREAMING_THRESHOLD_BYTES = 1024 * 1024
+
+# Lotes menores que isso não amortizam o custo de criar processos
+_MIN_FILES_FOR_POOL = 4
+
+
+@lru_cache(maxsize=4096)
+def _validate_file_cached(path: str, mtime: float, size: int) -> bool:
+    """
+    Valida um arquivo XML uma única vez por (caminho, mtime, tamanho)
+
+    Reexecuções de convert_batch sobre o mesmo diretório não pagam o
+    parse de validação de novo enquanto o arquivo não mudar.
+
+    Args:
+        path: Caminho do arquivo
+        mtime: st_mtime do arquivo (compõe a chave do cache)
+        size: st_size do arquivo (compõe a chave do cache)
+
+    Returns:
+        True se o arquivo é um XML válido
+    """
+    return XMLValidator().is_valid_xml_file(path)
+
+
+def _convert_one_file(xml_path, json_path, config, kwargs):
+    """
+    Converte um arquivo em um processo worker (função picklável)
+
+    Args:
+        xml_path: Caminho do XML de entrada
+        json_path: Caminho do JSON de saída
+        config: Configurações do conversor
+        kwargs: Configurações adicionais de conversão
+
+    Returns:
+        True se a conversão foi bem-sucedida
+    """
+    converter = XMLToJSONConverter(config=config)
+    return converter.convert_file(xml_path, json_path, **kwargs) is not None
+
 
 class XMLToJSONConverter:
     """
@@ -46,6 +94,8 @@ class XMLToJSONConverter:
         self,
         xml_path: Union[str, Path],
         json_path: Optional[Union[str, Path]] = None,
+        settings: Optional[ConversionSettings] = None,
+        extract_only: bool = False,
         **kwargs,
     ) -> Optional[Dict]:
         """
@@ -54,31 +104,67 @@ class XMLToJSONConverter:
         Args:
             xml_path: Caminho do arquivo XML
             json_path: Caminho do arquivo JSON de saída (opcional)
+            settings: Configurações imutáveis de conversão (opcional)
+            extract_only: Se True, retorna só os campos de NFe extraídos
+                direto da árvore, sem montar o dicionário completo
             **kwargs: Configurações adicionais
 
         Returns:
             Dict com os dados convertidos ou None em caso de erro
         """
+        if settings is not None:
+            kwargs = {**settings.as_kwargs(), **kwargs}
+
         try:
             xml_path = Path(xml_path)
 
-            # Valida se o arquivo existe
-            if not self.file_handler.validate_file_exists(xml_path):
+            # Um único stat cobre existência, chave do cache e threshold
+            try:
+                file_stat = xml_path.stat()
+            except OSError:
                 logger.error(f"Arquivo não encontrado: {xml_path}")
                 return None
 
-            # Valida se é um arquivo XML válido
-            if not self.validator.is_valid_xml_file(xml_path):
+            # Valida se é um arquivo XML válido (com cache por versão)
+            if not _validate_file_cached(
+                str(xml_path), file_stat.st_mtime, file_stat.st_size
+            ):
                 logger.error(f"Arquivo XML inválido: {xml_path}")
                 return None
 
-            # Lê o arquivo XML
-            xml_content = self.file_handler.read_file(xml_path)
-            if xml_content is None:
-                return None
+            # Fluxo só-extração: campos direto da árvore, sem dict completo
+            if extract_only:
+                from ..models.nfe_extractor import NFEExtractor
+
+                root = self.parser.parse_file(xml_path)
+                if root is None:
+                    return None
+                return NFEExtractor().extract_from_element(root)
+
+            # Arquivos grandes são convertidos em streaming (memória
+            # proporcional à profundidade, não ao tamanho do documento)
+            if file_stat.st_size > STREAMING_THRESHOLD_BYTES:
+                merged = {**self.default_settings, **self.config, **kwargs}
+                json_data = self.parser.parse_file_streaming(xml_path, merged)
+            else:
+                # Parse direto dos bytes do arquivo (sem intermediário str);
+                # já validado via is_valid_xml_file, sem revalidação aqui
+                root = self.parser.parse_file(xml_path)
+
+                if root is None:
+                    # Fallback com detecção de encoding para arquivos sem
+                    # declaração XML consistente
+                    xml_content = self.file_handler.read_file(xml_path)
+                    if xml_content is None:
+                        return None
+                    root = self.parser.parse_string(xml_content)
+
+                json_data = (
+                    self._convert_root(root, kwargs)
+                    if root is not None
+                    else None
+                )
 
-            # Converte para JSON
-            json_data = self.convert_string(xml_content, **kwargs)
             if json_data is None:
                 return None
 
@@ -97,58 +183,87 @@ class XMLToJSONConverter:
             logger.exception(f"Erro na conversão: {e}")
             return None
 
-    def convert_string(self, xml_string: str, **kwargs) -> Optional[Dict]:
+    def convert_string(
+        self,
+        xml_string: str,
+        settings: Optional[ConversionSettings] = None,
+        **kwargs,
+    ) -> Optional[Dict]:
         """
         Converte string XML para JSON
 
         Args:
             xml_string: String contendo XML
+            settings: Configurações imutáveis de conversão (opcional)
             **kwargs: Configurações adicionais
 
         Returns:
             Dict com os dados convertidos ou None em caso de erro
         """
+        if settings is not None:
+            kwargs = {**settings.as_kwargs(), **kwargs}
+
         try:
-            # Valida XML
-            if not self.validator.is_valid_xml_string(xml_string):
-                logger.error("XML inválido")
-                return None
+            merged = {**self.default_settings, **self.config, **kwargs}
 
-            # Faz parse do XML
+            # Sem lxml (ou sob demanda via 'use_expat'), o caminho expat
+            # vai de string a dicionário sem árvore intermediária
+            if merged.get("use_expat", USE_EXPAT_DEFAULT):
+                return self.parser.parse_string_expat(xml_string, merged)
+
+            # O próprio parse valida: erro de sintaxe resulta em None,
+            # sem o segundo ET.fromstring de is_valid_xml_string
             root = self.parser.parse_string(xml_string)
             if root is None:
+                logger.error("XML inválido")
                 return None
 
-            # Converte para dicionário
-            settings = {**self.default_settings, **self.config, **kwargs}
-
-            if settings.get("clean_namespaces", True):
-                root_tag = self.formatter.clean_namespace(root.tag)
-            else:
-                root_tag = root.tag
-
-            json_data = {root_tag: self.parser.element_to_dict(root, settings)}
-
-            return json_data
+            return self._convert_root(root, kwargs)
 
         except Exception as e:
             logger.exception(f"Erro na conversão de string: {e}")
             return None
 
+    def _convert_root(self, root, kwargs: Dict) -> Optional[Dict]:
+        """
+        Converte um elemento raiz já parseado para o dicionário final
+
+        Args:
+            root: Elemento raiz do XML
+            kwargs: Configurações adicionais de conversão
+
+        Returns:
+            Dict {tag_raiz: dados}
+        """
+        settings = {**self.default_settings, **self.config, **kwargs}
+
+        if settings.get("clean_namespaces", True):
+            root_tag = _strip_ns(root.tag)
+        else:
+            root_tag = root.tag
+
+        return {root_tag: self.parser.element_to_dict(root, settings)}
+
     def convert_batch(
         self,
         input_dir: Union[str, Path],
         output_dir: Optional[Union[str, Path]] = None,
         pattern: str = "*.xml",
+        max_workers: Optional[int] = None,
         **kwargs,
     ) -> Dict[str, bool]:
         """
         Converte múltiplos arquivos XML em lote
 
+        Arquivos são independentes, então lotes grandes são distribuídos
+        entre processos (o parsing é CPU-bound); lotes pequenos seguem
+        sequenciais para não pagar o custo de criação do pool.
+
         Args:
             input_dir: Diretório com arquivos XML
             output_dir: Diretório de saída (opcional)
             pattern: Padrão de arquivos (default: "*.xml")
+            max_workers: Número de processos (default: os.cpu_count())
             **kwargs: Configurações adicionais
 
         Returns:
@@ -178,13 +293,38 @@ class XMLToJSONConverter:
             output_dir = input_dir / "converted"
             output_dir.mkdir(exist_ok=True)
 
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+
         # Converte cada arquivo
-        for xml_file in xml_files:
-            json_file = output_dir / f"{xml_file.stem}.json"
+        if max_workers > 1 and len(xml_files) >= _MIN_FILES_FOR_POOL:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = {
+                    executor.submit(
+                        _convert_one_file,
+                        str(xml_file),
+                        str(output_dir / f"{xml_file.stem}.json"),
+                        self.config,
+                        kwargs,
+                    ): xml_file
+                    for xml_file in xml_files
+                }
+
+                for future in as_completed(futures):
+                    xml_file = futures[future]
+                    try:
+                        results[str(xml_file)] = future.result()
+                    except Exception as e:
+                        logger.exception(f"Erro ao converter {xml_file}: {e}")
+                        results[str(xml_file)] = False
+        else:
+            for xml_file in xml_files:
+                json_file = output_dir / f"{xml_file.stem}.json"
 
-            logger.info(f"Convertendo: {xml_file.name}")
-            result = self.convert_file(xml_file, json_file, **kwargs)
-            results[str(xml_file)] = result is not None
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"Convertendo: {xml_file.name}")
+                result = self.convert_file(xml_file, json_file, **kwargs)
+                results[str(xml_file)] = result is not None
 
         success_count = sum(results.values())
         logger.info(f"Conversão concluída: {success_count}/{len(xml_files)} arquivos")
@@ -210,14 +350,26 @@ class XMLToJSONConverter:
             if settings.get("create_output_dir", True):
                 json_path.parent.mkdir(parents=True, exist_ok=True)
 
-            # Configurações de formatação JSON
+            indent = settings.get("indent_json", 2)
+
+            # Caminho rápido: serializa em bytes com o backend mais rápido
+            # disponível (orjson/ujson) e grava em uma única escrita.
+            # orjson só indenta com 2 espaços e é sempre UTF-8, então
+            # pedidos fora desse formato seguem pela via tradicional.
+            if indent in (0, 2, None) and not settings.get("ensure_ascii", False):
+                payload = dump_json_bytes(data, indent=indent)
+                if write_json_bytes(json_path, payload):
+                    # write_json_bytes não passa pelo FileHandler; descarta
+                    # um eventual stat negativo em cache para este caminho
+                    self.file_handler.invalidate(json_path)
+                    return True
+                return False
+
             json_kwargs = {
-                "indent": settings.get("indent_json", 2),
+                "indent": indent,
                 "ensure_ascii": settings.get("ensure_ascii", False),
                 "separators": (",", ": "),
             }
-
-            # Salva arquivo
             return self.file_handler.write_json_file(data, json_path, **json_kwargs)
 
         except Exception as e:
@@ -0,0 +1,29 @@
+"""
+Configurações imutáveis de conversão
+"""
+
+from dataclasses import asdict, dataclass
+
+
+@dataclass(frozen=True)
+class ConversionSettings:
+    """
+    Conjunto imutável (e portanto hashable) de configurações de conversão
+
+    Por ser hashable, uma instância pode ser usada como chave de cache
+    por qualquer etapa que queira memoizar trabalho por configuração.
+    """
+
+    clean_namespaces: bool = True
+    preserve_attributes: bool = True
+    auto_type_conversion: bool = True
+    indent_json: int = 2
+
+    def as_kwargs(self):
+        """
+        Converte para o dicionário de kwargs aceito pelo conversor
+
+        Returns:
+            Dict com as configurações
+        """
+        return asdict(self)
@@ -2,11 +2,78 @@
 Módulo de parsing XML
 """
 
+import io
+import logging
+import os
+import re
 import xml.etree.ElementTree as ET
+from collections import defaultdict
+from xml.parsers import expat
 from typing import Dict, Optional, Any, Union
-from collections import OrderedDict
 
-from ..utils.formatters import XMLFormatter
+from ..utils.formatters import XMLFormatter, _strip_ns
+
+logger = logging.getLogger(__name__)
+
+# lxml (extra "performance") faz o parsing em C via libxml2; quando não
+# está instalado, o ElementTree da stdlib continua funcionando igual.
+try:
+    from lxml import etree as _lxml_etree
+
+    _HAS_LXML = True
+    _PARSE_ERRORS = (ET.ParseError, _lxml_etree.XMLSyntaxError)
+except ImportError:
+    _lxml_etree = None
+    _HAS_LXML = False
+    _PARSE_ERRORS = (ET.ParseError,)
+
+# Sem lxml, o caminho string->dict via expat (buffer_text) é o mais rápido
+USE_EXPAT_DEFAULT = not _HAS_LXML
+
+# Classifica o valor de um nó folha em uma única passada em C:
+# bool | inteiro | decimal (ponto ou vírgula brasileira) | string.
+# Buffer de leitura para parse direto de arquivo (menos syscalls de read)
+_READ_BUFFER = 1 << 20
+
+_TYPE_RE = re.compile(
+    r"^(?:(?P<bool>true|false)|(?P<int>-?\d+)|(?P<flt>-?\d+[.,]\d+))$",
+    re.IGNORECASE,
+)
+
+
+def _collapse_buckets(buckets: Dict) -> Dict:
+    """
+    Colapsa buckets {tag: [valores]} no formato final {tag: valor | lista}
+
+    Tags repetidas viram lista; tag única vira o próprio valor. A ordem de
+    primeira aparição é preservada pelo próprio dict.
+
+    Args:
+        buckets: Dicionário de listas acumuladas por tag
+
+    Returns:
+        Dicionário no formato de saída da conversão
+    """
+    return {
+        tag: values[0] if len(values) == 1 else values
+        for tag, values in buckets.items()
+    }
+
+
+class _Ctx:
+    """
+    Configurações de conversão resolvidas uma única vez
+
+    Evita repetir settings.get(...) por elemento: leitura de atributo em
+    objeto com __slots__ é bem mais barata que dict.get no hot path.
+    """
+
+    __slots__ = ("preserve_attrs", "clean_ns", "auto_type")
+
+    def __init__(self, settings: Dict):
+        self.preserve_attrs = settings.get("preserve_attributes", True)
+        self.clean_ns = settings.get("clean_namespaces", True)
+        self.auto_type = settings.get("auto_type_conversion", True)
 
 
 class XMLParser:
@@ -19,6 +86,31 @@ class XMLParser:
         self.formatter = XMLFormatter()
         self.stats = {"parsed_elements": 0, "parse_errors": 0}
 
+        # Parser lxml reutilizado entre chamadas (criá-lo por parse custa
+        # caro). Comentários e PIs são descartados no parse: eles não têm
+        # representação no JSON e suas tags não são strings.
+        if _HAS_LXML:
+            self._parser = _lxml_etree.XMLParser(
+                huge_tree=True,
+                resolve_entities=False,
+                remove_comments=True,
+                remove_pis=True,
+            )
+        else:
+            self._parser = None
+
+    def _fromstring(self, xml_string: str):
+        """Faz parse de string com o backend disponível (lxml ou stdlib)"""
+        if _HAS_LXML:
+            try:
+                return _lxml_etree.fromstring(xml_string, self._parser)
+            except ValueError:
+                # lxml rejeita str com declaração de encoding; re-encoda
+                return _lxml_etree.fromstring(
+                    xml_string.encode("utf-8"), self._parser
+                )
+        return ET.fromstring(xml_string)
+
     def parse_string(self, xml_string: str) -> Optional[ET.Element]:
         """
         Faz parse de string XML
@@ -30,156 +122,347 @@ class XMLParser:
             Elemento raiz ou None em caso de erro
         """
         try:
-            root = ET.fromstring(xml_string)
+            root = self._fromstring(xml_string)
             self.stats["parsed_elements"] += 1
             return root
-        except ET.ParseError as e:
-            print(f"❌ Erro no parse XML: {e}")
+        except _PARSE_ERRORS as e:
+            logger.error(f"Erro no parse XML: {e}")
             self.stats["parse_errors"] += 1
             return None
         except Exception as e:
-            print(f"❌ Erro inesperado no parse: {e}")
+            logger.error(f"Erro inesperado no parse: {e}")
             self.stats["parse_errors"] += 1
             return None
 
-    def parse_file(self, xml_path: str) -> Optional[ET.Element]:
+    def parse_file(self, source) -> Optional[ET.Element]:
         """
         Faz parse de arquivo XML
 
+        Lê os bytes direto do arquivo (I/O binária bufferizada) e deixa o
+        parser resolver o encoding pela declaração XML — sem o desvio por
+        str que decodifica e recodifica o documento inteiro.
+
         Args:
-            xml_path: Caminho do arquivo XML
+            source: Caminho do arquivo XML ou objeto de arquivo binário
 
         Returns:
             Elemento raiz ou None em caso de erro
         """
         try:
-            tree = ET.parse(xml_path)
+            if hasattr(source, "read"):
+                fh = source
+                close_fh = False
+            else:
+                fh = io.open(os.fspath(source), "rb", buffering=_READ_BUFFER)
+                close_fh = True
+
+            try:
+                if _HAS_LXML:
+                    tree = _lxml_etree.parse(fh, self._parser)
+                else:
+                    tree = ET.parse(fh)
+            finally:
+                if close_fh:
+                    fh.close()
+
             root = tree.getroot()
             self.stats["parsed_elements"] += 1
             return root
-        except ET.ParseError as e:
-            print(f"❌ Erro no parse do arquivo XML: {e}")
+        except _PARSE_ERRORS as e:
+            logger.error(f"Erro no parse do arquivo XML: {e}")
             self.stats["parse_errors"] += 1
             return None
-        except FileNotFoundError:
-            print(f"❌ Arquivo não encontrado: {xml_path}")
+        except (FileNotFoundError, OSError):
+            logger.error(f"Arquivo não encontrado: {source}")
             self.stats["parse_errors"] += 1
             return None
         except Exception as e:
-            print(f"❌ Erro inesperado no parse do arquivo: {e}")
+            logger.error(f"Erro inesperado no parse do arquivo: {e}")
             self.stats["parse_errors"] += 1
             return None
 
-    def element_to_dict(
-        self, element: ET.Element, settings: Dict
-    ) -> Union[Dict, str, None]:
+    def parse_file_streaming(
+        self, xml_path: str, settings: Dict
+    ) -> Optional[Dict]:
         """
-        Converte elemento XML para dicionário
+        Converte arquivo XML para dicionário via iterparse (streaming)
+
+        Constrói o resultado incrementalmente conforme os eventos de
+        início/fim chegam, liberando cada elemento já processado com
+        ``clear()``. A memória fica proporcional à profundidade da árvore
+        em vez do tamanho do documento — essencial para lotes grandes.
 
         Args:
-            element: Elemento XML
+            xml_path: Caminho do arquivo XML
             settings: Configurações de conversão
 
         Returns:
-            Dicionário, string ou None
+            Dict {tag_raiz: dados} ou None em caso de erro
         """
-        result = OrderedDict() if settings.get("preserve_order", True) else {}
-
-        # Adiciona atributos
-        if element.attrib and settings.get("preserve_attributes", True):
-            result["@attributes"] = dict(element.attrib)
+        ctx = _Ctx(settings)
+        clean_ns = ctx.clean_ns
+        iterparse = _lxml_etree.iterparse if _HAS_LXML else ET.iterparse
 
-        # Processa elementos filhos
-        children = list(element)
-        if children:
-            children_dict = (
-                OrderedDict() if settings.get("preserve_order", True) else {}
-            )
+        # Pilha de buckets de filhos, espelhando a recursão de
+        # element_to_dict: push no 'start', pop + anexa ao pai no 'end'.
+        stack = []
+        root_tag = None
+        root_value = None
 
-            for child in children:
-                # Limpa namespace se configurado
-                child_tag = (
-                    self.formatter.clean_namespace(child.tag)
-                    if settings.get("clean_namespaces", True)
-                    else child.tag
+        try:
+            for event, elem in iterparse(str(xml_path), events=("start", "end")):
+                if event == "start":
+                    stack.append(defaultdict(list))
+                    continue
+
+                buckets = stack.pop()
+                value = self._finalize_element(
+                    elem, _collapse_buckets(buckets), ctx
                 )
+                tag = _strip_ns(elem.tag) if clean_ns else elem.tag
 
-                child_data = self.element_to_dict(child, settings)
+                if stack:
+                    stack[-1][tag].append(value)
 
-                # Trata elementos com mesmo nome (cria lista)
-                if child_tag in children_dict:
-                    if not isinstance(children_dict[child_tag], list):
-                        children_dict[child_tag] = [children_dict[child_tag]]
-                    children_dict[child_tag].append(child_data)
+                    # Libera o subtree já convertido
+                    elem.clear()
+                    if _HAS_LXML:
+                        while elem.getprevious() is not None:
+                            del elem.getparent()[0]
                 else:
-                    children_dict[child_tag] = child_data
+                    root_tag, root_value = tag, value
 
-            # Se tem texto e filhos, adiciona o texto como '_text'
-            if element.text and element.text.strip():
-                result["_text"] = element.text.strip()
+            self.stats["parsed_elements"] += 1
+            return {root_tag: root_value}
 
-            result.update(children_dict)
+        except _PARSE_ERRORS as e:
+            logger.error(f"Erro no parse do arquivo XML: {e}")
+            self.stats["parse_errors"] += 1
+            return None
+        except (FileNotFoundError, OSError):
+            logger.error(f"Arquivo não encontrado: {xml_path}")
+            self.stats["parse_errors"] += 1
+            return None
+        except Exception as e:
+            logger.error(f"Erro inesperado no parse do arquivo: {e}")
+            self.stats["parse_errors"] += 1
+            return None
+
+    def _finalize_element(
+        self, element: ET.Element, children_dict: Dict, ctx: "_Ctx"
+    ) -> Union[Dict, str, None]:
+        """
+        Monta o valor final de um elemento a partir dos filhos já convertidos
+
+        Args:
+            element: Elemento XML (atributos e texto já disponíveis)
+            children_dict: Dicionário com os filhos convertidos
+            ctx: Configurações resolvidas (_Ctx)
+
+        Returns:
+            Dicionário, valor escalar ou None
+        """
+        return self._finalize_raw(
+            element.attrib, element.text, children_dict, ctx
+        )
+
+    def _finalize_raw(
+        self, attrib, text, children_dict: Dict, ctx: "_Ctx"
+    ) -> Union[Dict, str, None]:
+        """
+        Monta o valor final de um elemento a partir das partes cruas
+
+        Args:
+            attrib: Mapping de atributos (pode ser vazio)
+            text: Texto do elemento (antes do primeiro filho)
+            children_dict: Dicionário com os filhos convertidos
+            ctx: Configurações resolvidas (_Ctx)
+
+        Returns:
+            Dicionário, valor escalar ou None
+        """
+        result = {}
+
+        if attrib and ctx.preserve_attrs:
+            result["@attributes"] = dict(attrib)
 
+        if children_dict:
+            # Se tem texto e filhos, adiciona o texto como '_text'
+            if text and text.strip():
+                result["_text"] = text.strip()
+            result.update(children_dict)
         else:
-            # Elemento sem filhos - apenas texto
-            text = element.text.strip() if element.text else ""
+            text = text.strip() if text else ""
 
             if text:
                 if result:  # Se já tem atributos
-                    result["_value"] = self._convert_value_type(text, settings)
-                else:  # Se não tem atributos, retorna apenas o valor
-                    return self._convert_value_type(text, settings)
-            elif not result:  # Sem texto nem atributos
+                    result["_value"] = self._convert_value_type(text, ctx)
+                else:
+                    return self._convert_value_type(text, ctx)
+            elif not result:
                 return None
 
         return result if result else None
 
+    def parse_string_expat(
+        self, xml_string: str, settings: Dict
+    ) -> Optional[Dict]:
+        """
+        Converte string XML direto para dicionário usando expat
+
+        buffer_text junta blocos de texto adjacentes em um único evento e
+        os handlers alimentam a mesma pilha de buckets da conversão normal,
+        sem materializar uma árvore de elementos no meio do caminho.
+
+        Args:
+            xml_string: String contendo XML
+            settings: Configurações de conversão
+
+        Returns:
+            Dict {tag_raiz: dados} ou None em caso de erro
+        """
+        ctx = _Ctx(settings)
+        clean_ns = ctx.clean_ns
+
+        # namespace_separator="}" entrega nomes como "uri}tag", o mesmo
+        # sufixo da notação Clark que _strip_ns já sabe remover
+        parser = expat.ParserCreate(namespace_separator="}")
+        parser.buffer_text = True
+        parser.ordered_attributes = True
+
+        # Frame: [buckets, partes de texto, atributos, já tem filho]
+        stack = []
+        result = {}
+
+        def start_element(name, attrs):
+            if stack:
+                stack[-1][3] = True
+            stack.append([defaultdict(list), [], attrs, False])
+
+        def end_element(name):
+            buckets, text_parts, attrs, _ = stack.pop()
+
+            attrib = dict(zip(attrs[0::2], attrs[1::2])) if attrs else {}
+            if attrib:
+                # Recompõe a notação Clark de atributos com namespace
+                attrib = {
+                    ("{" + key if "}" in key else key): value
+                    for key, value in attrib.items()
+                }
+
+            value = self._finalize_raw(
+                attrib, "".join(text_parts), _collapse_buckets(buckets), ctx
+            )
+
+            if clean_ns:
+                tag = _strip_ns(name)
+            else:
+                tag = "{" + name if "}" in name else name
+
+            if stack:
+                stack[-1][0][tag].append(value)
+            else:
+                result[tag] = value
+
+        def char_data(data):
+            frame = stack[-1]
+            if not frame[3]:  # ignora texto após filhos (tail)
+                frame[1].append(data)
+
+        parser.StartElementHandler = start_element
+        parser.EndElementHandler = end_element
+        parser.CharacterDataHandler = char_data
+
+        try:
+            parser.Parse(xml_string, True)
+            self.stats["parsed_elements"] += 1
+            return result
+        except expat.ExpatError as e:
+            logger.error(f"Erro no parse XML: {e}")
+            self.stats["parse_errors"] += 1
+            return None
+        except Exception as e:
+            logger.error(f"Erro inesperado no parse: {e}")
+            self.stats["parse_errors"] += 1
+            return None
+
+    def element_to_dict(
+        self, element: ET.Element, settings: Dict
+    ) -> Union[Dict, str, None]:
+        """
+        Converte elemento XML para dicionário
+
+        Args:
+            element: Elemento XML
+            settings: Configurações de conversão
+
+        Returns:
+            Dicionário, string ou None
+        """
+        ctx = _Ctx(settings)
+        clean_ns = ctx.clean_ns
+
+        # Percurso pós-ordem com pilha explícita: sem frames de recursão e
+        # sem limite de profundidade para árvores infCpl/det muito aninhadas.
+        work = [(element, True)]  # True = entrada, False = saída
+        frames = []  # buckets de filhos em construção
+        value = None
+
+        while work:
+            elem, entering = work.pop()
+
+            if entering:
+                frames.append(defaultdict(list))
+                work.append((elem, False))
+                for child in reversed(list(elem)):
+                    # Ignora comentários/PIs (tag não é string) que tenham
+                    # sobrevivido ao parse, como em árvores vindas de fora
+                    if isinstance(child.tag, str):
+                        work.append((child, True))
+                continue
+
+            buckets = frames.pop()
+            value = self._finalize_element(elem, _collapse_buckets(buckets), ctx)
+
+            if frames:
+                tag = _strip_ns(elem.tag) if clean_ns else elem.tag
+                # Tag repetida acumula no bucket; vira lista no colapso
+                frames[-1][tag].append(value)
+
+        return value
+
     def _convert_value_type(
-        self, value: str, settings: Dict
+        self, value: str, ctx: "_Ctx"
     ) -> Union[str, int, float, bool, None]:
         """
         Converte string para tipo apropriado
 
         Args:
             value: Valor string
-            settings: Configurações de conversão
+            ctx: Configurações resolvidas (_Ctx)
 
         Returns:
             Valor convertido para tipo apropriado
         """
-        if not settings.get("auto_type_conversion", True):
+        if not ctx.auto_type:
             return value
 
         # Valor vazio
         if not value:
             return None
 
-        # Boolean
-        if value.lower() in ("true", "false"):
-            return value.lower() == "true"
-
-        # Número inteiro
-        if value.isdigit() or (value.startswith("-") and value[1:].isdigit()):
-            try:
-                return int(value)
-            except ValueError:
-                pass
-
-        # Número decimal
-        try:
-            if "." in value or "," in value:
-                # Tenta formato brasileiro (vírgula como decimal)
-                if "," in value and value.count(",") == 1:
-                    value_normalized = value.replace(",", ".")
-                else:
-                    value_normalized = value
-
-                return float(value_normalized)
-        except ValueError:
-            pass
+        # Uma única classificação via regex; conversão só no ramo que casou
+        match = _TYPE_RE.match(value)
+        if match is None:
+            return value
 
-        # Retorna string original se não conseguiu converter
-        return value
+        kind = match.lastgroup
+        if kind == "int":
+            return int(value)
+        if kind == "flt":
+            # Vírgula brasileira vira ponto decimal
+            return float(value.replace(",", "."))
+        return value[0] in ("t", "T")
 
     def extract_namespaces(self, element: ET.Element) -> Dict[str, str]:
         """
@@ -191,18 +474,25 @@ class XMLParser:
         Returns:
             Dict com mapeamento de prefixos e URIs de namespace
         """
+        # lxml expõe as declarações (herdadas inclusive) direto em C
+        if _HAS_LXML and hasattr(element, "nsmap"):
+            return {
+                prefix or "default": uri
+                for prefix, uri in element.nsmap.items()
+            }
+
+        # stdlib: uma única passada iterativa, deduplicando por URI, em
+        # vez da recursão que criava um dict por nível
         namespaces = {}
-
-        # Verifica o elemento atual
-        if "}" in element.tag:
-            uri = element.tag.split("}")[0][1:]  # Remove { do início
-            prefix = element.prefix or "default"
-            namespaces[prefix] = uri
-
-        # Verifica elementos filhos recursivamente
-        for child in element:
-            child_namespaces = self.extract_namespaces(child)
-            namespaces.update(child_namespaces)
+        seen = set()
+        for elem in element.iter():
+            tag = elem.tag
+            if isinstance(tag, str) and tag.startswith("{"):
+                uri = tag[1:tag.index("}")]
+                if uri not in seen:
+                    seen.add(uri)
+                    prefix = getattr(elem, "prefix", None) or "default"
+                    namespaces.setdefault(prefix, uri)
 
         return namespaces
 
@@ -221,9 +511,7 @@ class XMLParser:
         current = element
 
         while current is not None:
-            tag = (
-                self.formatter.clean_namespace(current.tag) if clean_ns else current.tag
-            )
+            tag = _strip_ns(current.tag) if clean_ns else current.tag
             path_parts.append(tag)
             current = current.getparent() if hasattr(current, "getparent") else None
 
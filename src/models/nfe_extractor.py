@@ -2,9 +2,201 @@
 Extrator específico para Nota Fiscal Eletrônica (NFe) brasileira
 """
 
+import re
+from functools import lru_cache
 from typing import Dict, Optional, List, Any
 from datetime import datetime
 
+try:
+    from lxml import etree as _lxml_etree
+
+    _HAS_LXML = True
+except ImportError:
+    _lxml_etree = None
+    _HAS_LXML = False
+
+NFE_NS = "http://www.portalfiscal.inf.br/nfe"
+
+# Um match pré-compilado substitui a checagem de tamanho + fatias:
+# valida e agrupa os dígitos em uma única passada em C.
+_CNPJ_RE = re.compile(r"^(\d{2})(\d{3})(\d{3})(\d{4})(\d{2})$")
+_CPF_RE = re.compile(r"^(\d{3})(\d{3})(\d{3})(\d{2})$")
+_CEP_RE = re.compile(r"^(\d{5})(\d{3})$")
+
+
+def _format_cnpj(cnpj: str) -> str:
+    """Formata CNPJ"""
+    match = _CNPJ_RE.match(str(cnpj))
+    if match:
+        return f"{match[1]}.{match[2]}.{match[3]}/{match[4]}-{match[5]}"
+    return cnpj
+
+
+def _format_cpf(cpf: str) -> str:
+    """Formata CPF"""
+    match = _CPF_RE.match(str(cpf))
+    if match:
+        return f"{match[1]}.{match[2]}.{match[3]}-{match[4]}"
+    return cpf
+
+
+def _format_cep(cep: str) -> str:
+    """Formata CEP"""
+    match = _CEP_RE.match(str(cep))
+    if match:
+        return f"{match[1]}-{match[2]}"
+    return cep
+
+
+def _brl(valor) -> str:
+    """Formata valor monetário em reais"""
+    # %-formatting em C é mais barato que f-string com format spec
+    return "R$ %.2f" % float(valor)
+
+
+# Tabelas (chave_origem, chave_destino, formatador) dirigem a extração:
+# um loop pequeno por seção em vez de uma escada de ifs por campo.
+_BASIC_MAP = (
+    ("nNF", "numero", None),
+    ("serie", "serie", None),
+    ("dhEmi", "data_emissao", None),
+    ("natOp", "natureza_operacao", None),
+    ("cUF", "codigo_uf", None),
+)
+
+_EMIT_MAP = (
+    ("xNome", "nome", None),
+    ("xFant", "fantasia", None),
+    ("CNPJ", "cnpj", _format_cnpj),
+    ("CPF", "cpf", _format_cpf),
+    ("IE", "inscricao_estadual", None),
+)
+
+_DEST_MAP = (
+    ("xNome", "nome", None),
+    ("CNPJ", "cnpj", _format_cnpj),
+    ("CPF", "cpf", _format_cpf),
+)
+
+_ENDER_PARTS = ("xLgr", "nro", "xCpl")
+
+_ENDER_MAP = (
+    ("xBairro", "bairro", None),
+    ("xMun", "municipio", None),
+    ("UF", "uf", None),
+    ("CEP", "cep", _format_cep),
+)
+
+_TOTAL_MAP = (
+    ("vNF", "valor_total", _brl),
+    ("vProd", "valor_produtos", _brl),
+    ("vICMS", "valor_icms", _brl),
+    ("vIPI", "valor_ipi", _brl),
+    ("vPIS", "valor_pis", _brl),
+    ("vCOFINS", "valor_cofins", _brl),
+)
+
+_PROD_MAP = (
+    ("xProd", "descricao", None),
+    ("qCom", "quantidade", float),
+    ("uCom", "unidade", None),
+    ("vUnCom", "valor_unitario", _brl),
+    ("vProd", "valor_total", _brl),
+    ("NCM", "ncm", None),
+    ("CFOP", "cfop", None),
+)
+
+_PROT_MAP = (
+    ("nProt", "numero_protocolo", None),
+    ("dhRecbto", "data_autorizacao", None),
+    ("cStat", "status_codigo", None),
+    ("xMotivo", "status_descricao", None),
+)
+
+
+# Caminhos relativos a infNFe para extração direta da árvore XML,
+# sem passar pela conversão completa para dicionário.
+_ELEMENT_FIELDS = (
+    ("ide/nNF", "numero", None),
+    ("ide/serie", "serie", None),
+    ("ide/dhEmi", "data_emissao", None),
+    ("ide/natOp", "natureza_operacao", None),
+    ("ide/cUF", "codigo_uf", None),
+    ("emit/xNome", "emitente_nome", None),
+    ("emit/xFant", "emitente_fantasia", None),
+    ("emit/CNPJ", "emitente_cnpj", _format_cnpj),
+    ("emit/CPF", "emitente_cpf", _format_cpf),
+    ("emit/IE", "emitente_inscricao_estadual", None),
+    ("dest/xNome", "destinatario_nome", None),
+    ("dest/CNPJ", "destinatario_cnpj", _format_cnpj),
+    ("dest/CPF", "destinatario_cpf", _format_cpf),
+    ("total/ICMSTot/vNF", "valor_total", _brl),
+    ("total/ICMSTot/vProd", "valor_produtos", _brl),
+    ("total/ICMSTot/vICMS", "valor_icms", _brl),
+    ("total/ICMSTot/vIPI", "valor_ipi", _brl),
+    ("total/ICMSTot/vPIS", "valor_pis", _brl),
+    ("total/ICMSTot/vCOFINS", "valor_cofins", _brl),
+)
+
+# Caminhos relativos à raiz (nfeProc)
+_ELEMENT_PROT_FIELDS = (
+    ("protNFe/infProt/nProt", "numero_protocolo", None),
+    ("protNFe/infProt/dhRecbto", "data_autorizacao", None),
+    ("protNFe/infProt/cStat", "status_codigo", None),
+    ("protNFe/infProt/xMotivo", "status_descricao", None),
+)
+
+
+@lru_cache(maxsize=None)
+def _ns_path(path: str) -> str:
+    """Converte um caminho relativo para a forma com namespace da NFe"""
+    return "/".join("{%s}%s" % (NFE_NS, part) for part in path.split("/"))
+
+
+if _HAS_LXML:
+    @lru_cache(maxsize=None)
+    def _compiled_xpath(path: str):
+        """Compila (uma vez) o XPath com namespace para o caminho dado"""
+        expr = "n:" + path.replace("/", "/n:") + "/text()"
+        return _lxml_etree.XPath(expr, namespaces={"n": NFE_NS})
+
+
+def _find_text(parent, path: str) -> Optional[str]:
+    """
+    Busca o texto de um caminho relativo, com ou sem namespace da NFe
+
+    Args:
+        parent: Elemento de partida
+        path: Caminho relativo separado por '/'
+
+    Returns:
+        Texto do primeiro elemento encontrado ou None
+    """
+    if _HAS_LXML:
+        found = _compiled_xpath(path)(parent)
+        if found:
+            return found[0]
+
+    element = parent.find(path)
+    if element is None:
+        element = parent.find(_ns_path(path))
+    return None if element is None else element.text
+
+
+def _apply_map(source: Dict, field_map, info: Dict) -> None:
+    """
+    Copia campos de source para info conforme a tabela de despacho
+
+    Args:
+        source: Dicionário de origem (seção da NFe)
+        field_map: Tupla de (chave_origem, chave_destino, formatador)
+        info: Dicionário de destino (mutado no lugar)
+    """
+    for src_key, dst_key, formatter in field_map:
+        value = source.get(src_key)
+        if value is not None:
+            info[dst_key] = formatter(value) if formatter else value
+
 
 class NFEExtractor:
     """
@@ -26,10 +218,10 @@ class NFEExtractor:
             Dict com informações extraídas ou None se não for NFe
         """
         try:
-            # Navega pela estrutura da NFe
+            # Falha rápido: um único encadeamento até infNFe, sem criar
+            # dicts intermediários para documentos que não são NFe
             nfe_proc = json_data.get("nfeProc", {})
-            nfe = nfe_proc.get("NFe", {})
-            inf_nfe = nfe.get("infNFe", {})
+            inf_nfe = nfe_proc.get("NFe", {}).get("infNFe")
 
             if not inf_nfe:
                 return None
@@ -37,30 +229,35 @@ class NFEExtractor:
             # Extrai informações básicas
             info = self._extract_basic_info(inf_nfe)
 
-            # Extrai informações do emitente
-            emit_info = self._extract_emitente_info(inf_nfe.get("emit", {}))
-            if emit_info:
-                info.update({"emitente_" + k: v for k, v in emit_info.items()})
-
-            # Extrai informações do destinatário
-            dest_info = self._extract_destinatario_info(inf_nfe.get("dest", {}))
-            if dest_info:
-                info.update({"destinatario_" + k: v for k, v in dest_info.items()})
-
-            # Extrai totais
-            total_info = self._extract_totals_info(inf_nfe.get("total", {}))
-            if total_info:
-                info.update(total_info)
-
-            # Extrai produtos
-            produtos_info = self._extract_produtos_info(inf_nfe.get("det", []))
-            if produtos_info:
-                info.update(produtos_info)
-
-            # Extrai informações do protocolo
-            prot_info = self._extract_protocolo_info(nfe_proc.get("protNFe", {}))
-            if prot_info:
-                info.update(prot_info)
+            # Cada seção só roda quando presente no documento
+            if "emit" in inf_nfe:
+                emit_info = self._extract_emitente_info(inf_nfe["emit"])
+                if emit_info:
+                    info.update(
+                        {"emitente_" + k: v for k, v in emit_info.items()}
+                    )
+
+            if "dest" in inf_nfe:
+                dest_info = self._extract_destinatario_info(inf_nfe["dest"])
+                if dest_info:
+                    info.update(
+                        {"destinatario_" + k: v for k, v in dest_info.items()}
+                    )
+
+            if "total" in inf_nfe:
+                total_info = self._extract_totals_info(inf_nfe["total"])
+                if total_info:
+                    info.update(total_info)
+
+            if "det" in inf_nfe:
+                produtos_info = self._extract_produtos_info(inf_nfe["det"])
+                if produtos_info:
+                    info.update(produtos_info)
+
+            if "protNFe" in nfe_proc:
+                prot_info = self._extract_protocolo_info(nfe_proc["protNFe"])
+                if prot_info:
+                    info.update(prot_info)
 
             self.extracted_count += 1
             return info
@@ -74,18 +271,7 @@ class NFEExtractor:
         ide = inf_nfe.get("ide", {})
 
         info = {}
-
-        # Informações de identificação
-        if "nNF" in ide:
-            info["numero"] = ide["nNF"]
-        if "serie" in ide:
-            info["serie"] = ide["serie"]
-        if "dhEmi" in ide:
-            info["data_emissao"] = ide["dhEmi"]
-        if "natOp" in ide:
-            info["natureza_operacao"] = ide["natOp"]
-        if "cUF" in ide:
-            info["codigo_uf"] = ide["cUF"]
+        _apply_map(ide, _BASIC_MAP, info)
 
         # Chave da NFe dos atributos
         if "@attributes" in inf_nfe and "Id" in inf_nfe["@attributes"]:
@@ -101,40 +287,8 @@ class NFEExtractor:
             return {}
 
         info = {}
-
-        if "xNome" in emit:
-            info["nome"] = emit["xNome"]
-        if "xFant" in emit:
-            info["fantasia"] = emit["xFant"]
-        if "CNPJ" in emit:
-            info["cnpj"] = self._format_cnpj(emit["CNPJ"])
-        if "CPF" in emit:
-            info["cpf"] = self._format_cpf(emit["CPF"])
-        if "IE" in emit:
-            info["inscricao_estadual"] = emit["IE"]
-
-        # Endereço do emitente
-        ender_emit = emit.get("enderEmit", {})
-        if ender_emit:
-            endereco_parts = []
-            if "xLgr" in ender_emit:
-                endereco_parts.append(ender_emit["xLgr"])
-            if "nro" in ender_emit:
-                endereco_parts.append(ender_emit["nro"])
-            if "xCpl" in ender_emit:
-                endereco_parts.append(ender_emit["xCpl"])
-
-            if endereco_parts:
-                info["endereco"] = ", ".join(endereco_parts)
-
-            if "xBairro" in ender_emit:
-                info["bairro"] = ender_emit["xBairro"]
-            if "xMun" in ender_emit:
-                info["municipio"] = ender_emit["xMun"]
-            if "UF" in ender_emit:
-                info["uf"] = ender_emit["UF"]
-            if "CEP" in ender_emit:
-                info["cep"] = self._format_cep(ender_emit["CEP"])
+        _apply_map(emit, _EMIT_MAP, info)
+        self._extract_endereco(emit.get("enderEmit", {}), info)
 
         return info
 
@@ -144,59 +298,31 @@ class NFEExtractor:
             return {}
 
         info = {}
-
-        if "xNome" in dest:
-            info["nome"] = dest["xNome"]
-        if "CNPJ" in dest:
-            info["cnpj"] = self._format_cnpj(dest["CNPJ"])
-        if "CPF" in dest:
-            info["cpf"] = self._format_cpf(dest["CPF"])
-
-        # Endereço do destinatário
-        ender_dest = dest.get("enderDest", {})
-        if ender_dest:
-            endereco_parts = []
-            if "xLgr" in ender_dest:
-                endereco_parts.append(ender_dest["xLgr"])
-            if "nro" in ender_dest:
-                endereco_parts.append(ender_dest["nro"])
-            if "xCpl" in ender_dest:
-                endereco_parts.append(ender_dest["xCpl"])
-
-            if endereco_parts:
-                info["endereco"] = ", ".join(endereco_parts)
-
-            if "xBairro" in ender_dest:
-                info["bairro"] = ender_dest["xBairro"]
-            if "xMun" in ender_dest:
-                info["municipio"] = ender_dest["xMun"]
-            if "UF" in ender_dest:
-                info["uf"] = ender_dest["UF"]
-            if "CEP" in ender_dest:
-                info["cep"] = self._format_cep(ender_dest["CEP"])
+        _apply_map(dest, _DEST_MAP, info)
+        self._extract_endereco(dest.get("enderDest", {}), info)
 
         return info
 
+    def _extract_endereco(self, endereco: Dict, info: Dict) -> None:
+        """Extrai campos de endereço (emitente ou destinatário) em info"""
+        if not endereco:
+            return
+
+        endereco_parts = [
+            str(endereco[part]) for part in _ENDER_PARTS if part in endereco
+        ]
+        if endereco_parts:
+            info["endereco"] = ", ".join(endereco_parts)
+
+        _apply_map(endereco, _ENDER_MAP, info)
+
     def _extract_totals_info(self, total: Dict) -> Dict:
         """Extrai informações de totais"""
         if not total:
             return {}
 
         info = {}
-        icms_tot = total.get("ICMSTot", {})
-
-        if "vNF" in icms_tot:
-            info["valor_total"] = f"R$ {float(icms_tot['vNF']):.2f}"
-        if "vProd" in icms_tot:
-            info["valor_produtos"] = f"R$ {float(icms_tot['vProd']):.2f}"
-        if "vICMS" in icms_tot:
-            info["valor_icms"] = f"R$ {float(icms_tot['vICMS']):.2f}"
-        if "vIPI" in icms_tot:
-            info["valor_ipi"] = f"R$ {float(icms_tot['vIPI']):.2f}"
-        if "vPIS" in icms_tot:
-            info["valor_pis"] = f"R$ {float(icms_tot['vPIS']):.2f}"
-        if "vCOFINS" in icms_tot:
-            info["valor_cofins"] = f"R$ {float(icms_tot['vCOFINS']):.2f}"
+        _apply_map(total.get("ICMSTot", {}), _TOTAL_MAP, info)
 
         return info
 
@@ -208,32 +334,19 @@ class NFEExtractor:
         # det pode ser dict (1 produto) ou list (múltiplos produtos)
         produtos = det if isinstance(det, list) else [det]
 
-        info = {"quantidade_itens": len(produtos), "produtos": []}
-
+        produtos_info = []
         for produto_det in produtos:
             prod = produto_det.get("prod", {})
             if prod:
-                produto_info = {}
-
-                if "xProd" in prod:
-                    produto_info["descricao"] = prod["xProd"]
-                if "qCom" in prod:
-                    produto_info["quantidade"] = float(prod["qCom"])
-                if "uCom" in prod:
-                    produto_info["unidade"] = prod["uCom"]
-                if "vUnCom" in prod:
-                    produto_info["valor_unitario"] = f"R$ {float(prod['vUnCom']):.2f}"
-                if "vProd" in prod:
-                    produto_info["valor_total"] = f"R$ {float(prod['vProd']):.2f}"
-                if "NCM" in prod:
-                    produto_info["ncm"] = prod["NCM"]
-                if "CFOP" in prod:
-                    produto_info["cfop"] = prod["CFOP"]
-
+                produto_info = {
+                    dst_key: formatter(prod[src_key]) if formatter else prod[src_key]
+                    for src_key, dst_key, formatter in _PROD_MAP
+                    if src_key in prod
+                }
                 if produto_info:
-                    info["produtos"].append(produto_info)
+                    produtos_info.append(produto_info)
 
-        return info
+        return {"quantidade_itens": len(produtos), "produtos": produtos_info}
 
     def _extract_protocolo_info(self, prot_nfe: Dict) -> Dict:
         """Extrai informações do protocolo"""
@@ -241,39 +354,57 @@ class NFEExtractor:
             return {}
 
         info = {}
-        inf_prot = prot_nfe.get("infProt", {})
-
-        if "nProt" in inf_prot:
-            info["numero_protocolo"] = inf_prot["nProt"]
-        if "dhRecbto" in inf_prot:
-            info["data_autorizacao"] = inf_prot["dhRecbto"]
-        if "cStat" in inf_prot:
-            info["status_codigo"] = inf_prot["cStat"]
-        if "xMotivo" in inf_prot:
-            info["status_descricao"] = inf_prot["xMotivo"]
+        _apply_map(prot_nfe.get("infProt", {}), _PROT_MAP, info)
 
         return info
 
-    def _format_cnpj(self, cnpj: str) -> str:
-        """Formata CNPJ"""
-        cnpj_str = str(cnpj)
-        if len(cnpj_str) == 14:
-            return f"{cnpj[:2]}.{cnpj[2:5]}.{cnpj[5:8]}/{cnpj[8:12]}-{cnpj[12:]}"
-        return cnpj
-
-    def _format_cpf(self, cpf: str) -> str:
-        """Formata CPF"""
-        cpf_str = str(cpf)
-        if len(cpf_str) == 11:
-            return f"{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}"
-        return cpf
-
-    def _format_cep(self, cep: str) -> str:
-        """Formata CEP"""
-        cep_str = str(cep)
-        if len(cep_str) == 8:
-            return f"{cep[:5]}-{cep[5:]}"
-        return cep
+    def extract_from_element(self, root) -> Optional[Dict]:
+        """
+        Extrai informações da NFe direto do elemento XML parseado
+
+        Evita construir o dicionário completo do documento quando o
+        chamador só quer os campos extraídos: cada campo vira uma busca
+        direta na árvore (XPath compilado sob lxml).
+
+        Args:
+            root: Elemento raiz do XML (nfeProc ou NFe)
+
+        Returns:
+            Dict com informações extraídas ou None se não for NFe
+        """
+        try:
+            inf_nfe = root.find(".//{%s}infNFe" % NFE_NS)
+            if inf_nfe is None:
+                inf_nfe = root.find(".//infNFe")
+            if inf_nfe is None:
+                return None
+
+            info = {}
+            for path, dst_key, formatter in _ELEMENT_FIELDS:
+                value = _find_text(inf_nfe, path)
+                if value is not None:
+                    info[dst_key] = formatter(value) if formatter else value
+
+            # Chave da NFe do atributo Id
+            chave = inf_nfe.get("Id", "")
+            if chave.startswith("NFe"):
+                info["chave_nfe"] = chave[3:]
+
+            for path, dst_key, formatter in _ELEMENT_PROT_FIELDS:
+                value = _find_text(root, path)
+                if value is not None:
+                    info[dst_key] = formatter(value) if formatter else value
+
+            dets = inf_nfe.findall("{%s}det" % NFE_NS) or inf_nfe.findall("det")
+            if dets:
+                info["quantidade_itens"] = len(dets)
+
+            self.extracted_count += 1
+            return info
+
+        except Exception as e:
+            print(f"❌ Erro ao extrair informações da NFe: {e}")
+            return None
 
     def extract_summary(self, json_data: Dict) -> Optional[Dict]:
         """
@@ -0,0 +1,52 @@
+"""
+Módulo de descoberta de arquivos para conversão em lote
+"""
+
+import fnmatch
+import os
+import re
+from typing import Iterator, Optional, Tuple, Union
+
+from config.settings import match_xml
+
+
+def iter_xml_files(
+    root: Union[str, os.PathLike],
+    pattern: Optional[str] = None,
+    recursive: bool = False,
+) -> Iterator[Tuple[str, os.stat_result]]:
+    """
+    Itera arquivos que casam com o padrão usando os.scandir
+
+    Cada diretório é lido com uma única chamada getdents; o tipo da
+    entrada vem do próprio dirent e o stat fica em cache no DirEntry,
+    evitando o stat extra por arquivo que Path.glob faz.
+
+    Args:
+        root: Diretório raiz da busca
+        pattern: Padrão de nome de arquivo (fnmatch); None usa o matcher
+            pré-compilado dos padrões XML suportados (match_xml)
+        recursive: Se deve descer em subdiretórios
+
+    Yields:
+        Tuplas (caminho, os.stat_result) dos arquivos encontrados
+    """
+    if pattern is None:
+        match = match_xml
+    else:
+        match = re.compile(fnmatch.translate(pattern)).match
+    stack = [os.fspath(root)]
+
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive:
+                            stack.append(entry.path)
+                    elif entry.is_file() and match(entry.name):
+                        yield entry.path, entry.stat()
+        except OSError:
+            # Diretório removido ou sem permissão durante a varredura
+            continue
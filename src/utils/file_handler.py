@@ -2,11 +2,62 @@
 Módulo para manipulação de arquivos
 """
 
+import fnmatch
 import json
 import os
+import re
+import stat as stat_module
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Optional, Union, Any
 
+from config.settings import dump_json_bytes
+
+# Cache de stat por caminho: a sequência típica exists -> is_file ->
+# get_file_size sobre o mesmo arquivo paga um único syscall (inclusive
+# para caminhos inexistentes, que também são memorizados). Escritas e
+# remoções feitas pelo próprio FileHandler invalidam a entrada;
+# mudanças externas pedem FileHandler.invalidate(path).
+_STAT_CACHE_MAX = 4096
+_stat_cache = {}
+
+
+@lru_cache(maxsize=128)
+def _compiled_pattern(pattern):
+    """Compila (uma vez por padrão) o matcher glob usado em list_files"""
+    return re.compile(fnmatch.translate(pattern)).match
+
+
+def _cached_stat(path_str):
+    """
+    Retorna o os.stat_result de um caminho, com cache por path
+
+    Args:
+        path_str: Caminho do arquivo como string
+
+    Returns:
+        os.stat_result ou None se o caminho não existe/não é acessível
+    """
+    try:
+        return _stat_cache[path_str]
+    except KeyError:
+        pass
+
+    try:
+        st = os.stat(path_str)
+    except OSError:
+        st = None
+
+    if len(_stat_cache) >= _STAT_CACHE_MAX:
+        _stat_cache.clear()
+    _stat_cache[path_str] = st
+    return st
+
+
+def _invalidate_stat(path_str):
+    """Descarta a entrada de cache de um caminho"""
+    _stat_cache.pop(path_str, None)
+
 
 class FileHandler:
     """
@@ -27,7 +78,7 @@ class FileHandler:
         Returns:
             True se arquivo existe
         """
-        return Path(file_path).exists()
+        return _cached_stat(os.fspath(file_path)) is not None
 
     def validate_is_file(self, file_path: Union[str, Path]) -> bool:
         """
@@ -39,8 +90,19 @@ class FileHandler:
         Returns:
             True se é arquivo
         """
-        path = Path(file_path)
-        return path.exists() and path.is_file()
+        # Um único os.stat (com cache) responde "existe?" e "é arquivo?";
+        # os predicados do pathlib fariam um syscall para cada pergunta
+        st = _cached_stat(os.fspath(file_path))
+        return st is not None and stat_module.S_ISREG(st.st_mode)
+
+    def invalidate(self, file_path: Union[str, Path]) -> None:
+        """
+        Descarta o stat em cache de um caminho modificado externamente
+
+        Args:
+            file_path: Caminho do arquivo
+        """
+        _invalidate_stat(os.fspath(file_path))
 
     def get_file_extension(self, file_path: Union[str, Path]) -> str:
         """
@@ -52,7 +114,9 @@ class FileHandler:
         Returns:
             Extensão do arquivo (sem o ponto)
         """
-        return Path(file_path).suffix.lower().lstrip(".")
+        # os.path.splitext direto: sem parsing/normalização do pathlib
+        # para uma consulta que só olha o sufixo
+        return os.path.splitext(os.fspath(file_path))[1].lower().lstrip(".")
 
     def get_file_size(self, file_path: Union[str, Path]) -> int:
         """
@@ -64,10 +128,8 @@ class FileHandler:
         Returns:
             Tamanho em bytes
         """
-        try:
-            return Path(file_path).stat().st_size
-        except (OSError, FileNotFoundError):
-            return 0
+        st = _cached_stat(os.fspath(file_path))
+        return st.st_size if st is not None else 0
 
     def get_file_info(self, file_path: Union[str, Path]) -> Dict:
         """
@@ -81,27 +143,29 @@ class FileHandler:
         """
         path = Path(file_path)
 
-        if not path.exists():
-            return {"exists": False}
-
+        # Um único os.stat fornece existência, tipo, tamanho e datas;
+        # exists()/is_file()/is_dir() repetiriam o mesmo syscall
         try:
-            stat = path.stat()
-            return {
-                "exists": True,
-                "is_file": path.is_file(),
-                "is_dir": path.is_dir(),
-                "name": path.name,
-                "stem": path.stem,
-                "suffix": path.suffix,
-                "size_bytes": stat.st_size,
-                "size_mb": round(stat.st_size / (1024 * 1024), 2),
-                "modified": stat.st_mtime,
-                "created": stat.st_ctime,
-                "absolute_path": str(path.absolute()),
-            }
+            st = os.stat(str(path))
+        except FileNotFoundError:
+            return {"exists": False}
         except OSError as e:
             return {"exists": True, "error": str(e)}
 
+        return {
+            "exists": True,
+            "is_file": stat_module.S_ISREG(st.st_mode),
+            "is_dir": stat_module.S_ISDIR(st.st_mode),
+            "name": path.name,
+            "stem": path.stem,
+            "suffix": path.suffix,
+            "size_bytes": st.st_size,
+            "size_mb": round(st.st_size / (1024 * 1024), 2),
+            "modified": st.st_mtime,
+            "created": st.st_ctime,
+            "absolute_path": str(path.absolute()),
+        }
+
     def read_file(
         self, file_path: Union[str, Path], encoding: Optional[str] = None
     ) -> Optional[str]:
@@ -115,26 +179,45 @@ class FileHandler:
         Returns:
             Conteúdo do arquivo ou None em caso de erro
         """
-        path = Path(file_path)
+        path = os.fspath(file_path)
 
         if not self.validate_is_file(path):
             print(f"❌ Arquivo não encontrado ou não é um arquivo: {path}")
             return None
 
+        # Lê os bytes do disco uma única vez; as tentativas de encoding
+        # viram decodes em memória em vez de reaberturas do arquivo
+        try:
+            with open(path, "rb") as file:
+                raw = file.read()
+        except Exception as e:
+            print(f"❌ Erro ao ler arquivo {path}: {e}")
+            return None
+
+        # Vazio é decidido uma vez, nos bytes: o strip() por tentativa
+        # fazia um latin-1 "bem-sucedido" de conteúdo em branco cair no
+        # próximo encoding em vez de retornar
+        if not raw:
+            print(f"❌ Arquivo vazio: {path}")
+            return None
+
+        # BOM UTF-8 resolve o encoding sem decodificação especulativa;
+        # se o conteúdo não for UTF-8 válido apesar do BOM, cai para a
+        # lista de fallbacks abaixo
+        if raw[:3] == b"\xef\xbb\xbf":
+            try:
+                return raw.decode("utf-8-sig")
+            except UnicodeDecodeError:
+                pass
+
         # Lista de encodings para tentar
         encodings_to_try = [encoding] if encoding else self.supported_encodings
 
         for enc in encodings_to_try:
             try:
-                with open(path, "r", encoding=enc) as file:
-                    content = file.read()
-                    if content.strip():  # Verifica se não está vazio
-                        return content
+                return raw.decode(enc)
             except (UnicodeDecodeError, UnicodeError):
                 continue
-            except Exception as e:
-                print(f"❌ Erro ao ler arquivo {path}: {e}")
-                return None
 
         print(
             f"❌ Não foi possível ler o arquivo com nenhum encoding suportado: {path}"
@@ -167,9 +250,12 @@ class FileHandler:
             if create_dirs:
                 path.parent.mkdir(parents=True, exist_ok=True)
 
-            with open(path, "w", encoding=encoding) as file:
-                file.write(content)
+            # Codifica uma vez e grava em modo binário: uma única escrita
+            # do buffer pronto, sem a máquina de estados do TextIOWrapper
+            with open(path, "wb") as file:
+                file.write(content.encode(encoding))
 
+            _invalidate_stat(str(path))
             return True
 
         except Exception as e:
@@ -210,15 +296,82 @@ class FileHandler:
             }
             default_json_kwargs.update(json_kwargs)
 
-            with open(path, "w", encoding="utf-8") as file:
-                json.dump(data, file, **default_json_kwargs)
+            # Serializa para bytes de uma vez; pedidos no formato padrão
+            # vão pelo backend rápido (orjson/ujson, extra "performance"),
+            # que só produz indentação de 2 espaços em UTF-8
+            indent = default_json_kwargs["indent"]
+            if (
+                indent in (0, 2, None)
+                and not default_json_kwargs["ensure_ascii"]
+                and default_json_kwargs["separators"] == (",", ": ")
+                and not default_json_kwargs.get("sort_keys", False)
+            ):
+                payload = dump_json_bytes(data, indent=indent)
+            else:
+                payload = json.dumps(data, **default_json_kwargs).encode("utf-8")
 
+            with open(path, "wb") as file:
+                file.write(payload)
+
+            _invalidate_stat(str(path))
             return True
 
         except Exception as e:
             print(f"❌ Erro ao salvar JSON {file_path}: {e}")
             return False
 
+    def write_json_files_batch(
+        self,
+        items: Dict[Union[str, Path], Any],
+        max_workers: Optional[int] = None,
+        **json_kwargs,
+    ) -> Dict[str, bool]:
+        """
+        Escreve vários arquivos JSON com escritas sobrepostas
+
+        Cada write() bloqueia no disco, não no interpretador; com várias
+        escritas em voo ao mesmo tempo o custo passa a ser a banda do
+        dispositivo, não a latência de um arquivo por vez.
+
+        Args:
+            items: Dict {caminho: dados} com os arquivos a gravar
+            max_workers: Número de threads (default: min(8, nº de itens))
+            **json_kwargs: Argumentos para json.dump
+
+        Returns:
+            Dict com resultados {caminho: sucesso}
+        """
+        if not items:
+            return {}
+
+        if max_workers is None:
+            max_workers = min(8, len(items))
+
+        if max_workers <= 1 or len(items) == 1:
+            return {
+                str(path): self.write_json_file(data, path, **json_kwargs)
+                for path, data in items.items()
+            }
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        results = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                str(path): executor.submit(
+                    self.write_json_file, data, path, **json_kwargs
+                )
+                for path, data in items.items()
+            }
+            for path_str, future in futures.items():
+                try:
+                    results[path_str] = future.result()
+                except Exception as e:
+                    print(f"❌ Erro ao salvar JSON {path_str}: {e}")
+                    results[path_str] = False
+
+        return results
+
     def list_files(
         self, directory: Union[str, Path], pattern: str = "*", recursive: bool = False
     ) -> List[Path]:
@@ -234,19 +387,33 @@ class FileHandler:
             Lista de caminhos de arquivos
         """
         try:
-            dir_path = Path(directory)
+            root = os.fspath(directory)
 
-            if not dir_path.exists() or not dir_path.is_dir():
+            if not os.path.isdir(root):
                 print(f"❌ Diretório não encontrado: {directory}")
                 return []
 
-            if recursive:
-                files = list(dir_path.rglob(pattern))
-            else:
-                files = list(dir_path.glob(pattern))
-
-            # Filtra apenas arquivos (não diretórios)
-            return [f for f in files if f.is_file()]
+            # os.scandir devolve o tipo junto com cada entrada (d_type),
+            # então o filtro "é arquivo?" não custa um stat extra por path
+            match = _compiled_pattern(pattern)
+            files = []
+            stack = [root]
+
+            while stack:
+                current = stack.pop()
+                try:
+                    with os.scandir(current) as entries:
+                        for entry in entries:
+                            if entry.is_dir(follow_symlinks=False):
+                                if recursive:
+                                    stack.append(entry.path)
+                            elif match(entry.name) and entry.is_file():
+                                files.append(Path(entry.path))
+                except OSError:
+                    # Subdiretório inacessível não aborta a listagem
+                    continue
+
+            return files
 
         except Exception as e:
             print(f"❌ Erro ao listar arquivos: {e}")
@@ -281,8 +448,9 @@ class FileHandler:
         """
         try:
             path = Path(file_path)
-            if path.exists() and path.is_file():
+            if self.validate_is_file(path):
                 path.unlink()
+                _invalidate_stat(str(path))
                 return True
             else:
                 print(f"❌ Arquivo não encontrado: {file_path}")
@@ -6,6 +6,97 @@ import re
 from typing import Dict, Any, Optional, Union
 from datetime import datetime
 import json
+from functools import lru_cache
+from sys import intern as _intern
+
+from config.settings import dump_json_bytes
+
+# Vocabulário fixo da NFe pré-internado: tags repetidas em milhares de
+# elementos compartilham uma única string e o hash do dict vira
+# comparação de ponteiro.
+_NFE_TAGS = frozenset(map(_intern, (
+    "nfeProc", "NFe", "infNFe", "ide", "emit", "dest", "det", "prod",
+    "total", "ICMSTot", "nNF", "serie", "dhEmi", "natOp", "cUF",
+    "xNome", "xFant", "CNPJ", "CPF", "IE", "enderEmit", "enderDest",
+    "xLgr", "nro", "xCpl", "xBairro", "xMun", "UF", "CEP",
+    "vNF", "vProd", "vICMS", "vIPI", "vPIS", "vCOFINS",
+    "qCom", "uCom", "vUnCom", "xProd", "NCM", "CFOP",
+    "transp", "pag", "protNFe", "infProt", "nProt", "dhRecbto",
+    "cStat", "xMotivo",
+)))
+
+
+# Padrões usados nos hot paths de normalização, compilados uma vez no
+# import: .sub direto no objeto compilado dispensa o lookup de cache do re
+_RE_DOUBLE_NEWLINE = re.compile(r"\n\s*\n")
+_RE_MULTI_SPACE = re.compile(r"[ \t]+")
+_RE_CTRL = re.compile(r"[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]")
+_RE_WS = re.compile(r"\s+")
+
+# Tabela de deleção para extrair dígitos de documentos curtos
+# (CPF/CNPJ/CEP/telefone): str.translate roda inteiro em C, sem a VM de
+# regex por chamada; bytes Latin-1 fora de 0-9 são descartados
+_KEEP_DIGITS = str.maketrans(
+    "", "", "".join(chr(c) for c in range(256) if not "0" <= chr(c) <= "9")
+)
+
+# Tabela para o formato monetário brasileiro ("1.234.567,89"): descarta
+# os pontos de milhar e troca a vírgula decimal em uma única passada C,
+# no lugar de dois replace encadeados
+_BR_MONEY = str.maketrans({",": ".", ".": None})
+_DATE_PATTERNS = (
+    re.compile(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}[-+]\d{2}:\d{2}"),  # ISO 8601 com timezone
+    re.compile(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}"),  # ISO 8601 sem timezone
+    re.compile(r"\d{4}-\d{2}-\d{2}"),  # Data simples
+)
+
+
+@lru_cache(maxsize=1024)
+def _valid_iso_date(date_string: str) -> bool:
+    """
+    Verifica se uma string é uma data/hora ISO 8601 reconhecida
+
+    Lotes de NFe repetem o mesmo dhEmi em milhares de campos, então o
+    resultado é memorizado por string; o sufixo de timezone é removido
+    por fatiamento O(1) em vez de regex.
+
+    Args:
+        date_string: String com data
+
+    Returns:
+        True se a string casa com um dos formatos de data aceitos
+    """
+    for pattern in _DATE_PATTERNS:
+        if pattern.match(date_string):
+            clean_date = date_string
+            if "T" in date_string:
+                # Sufixo "+HH:MM"/"-HH:MM": fatia fixa, sem regex
+                if date_string[-6] in "+-" and date_string[-3] == ":":
+                    clean_date = date_string[:-6]
+            try:
+                datetime.fromisoformat(clean_date)
+            except ValueError:
+                continue
+            return True
+    return False
+
+
+def _strip_ns(tag: str) -> str:
+    """
+    Remove o namespace (notação Clark) de uma tag XML
+
+    Função de módulo para o hot path da conversão: sem frame de método,
+    sem regex — apenas um rpartition em C quando há namespace. O
+    resultado é internado para que chaves repetidas compartilhem a
+    mesma string.
+
+    Args:
+        tag: Nome da tag, com ou sem namespace
+
+    Returns:
+        Nome da tag sem namespace (internado)
+    """
+    return _intern(tag.rpartition("}")[2]) if "}" in tag else _intern(tag)
 
 
 class XMLFormatter:
@@ -15,12 +106,7 @@ class XMLFormatter:
 
     def __init__(self):
         """Inicializa formatador"""
-        self.namespace_pattern = re.compile(r"\{.*\}")
-        self.date_patterns = [
-            r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}[-+]\d{2}:\d{2}",  # ISO 8601 com timezone
-            r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}",  # ISO 8601 sem timezone
-            r"\d{4}-\d{2}-\d{2}",  # Data simples
-        ]
+        self.date_patterns = _DATE_PATTERNS
 
     def clean_namespace(self, tag: str) -> str:
         """
@@ -32,7 +118,7 @@ class XMLFormatter:
         Returns:
             Nome da tag sem namespace
         """
-        return self.namespace_pattern.sub("", tag)
+        return _strip_ns(tag)
 
     def clean_all_namespaces(self, data: Dict) -> Dict:
         """
@@ -42,19 +128,39 @@ class XMLFormatter:
             data: Dicionário com dados
 
         Returns:
-            Dicionário com chaves sem namespace
+            O mesmo contêiner, com as chaves sem namespace (in place)
         """
-        if isinstance(data, dict):
-            cleaned = {}
-            for key, value in data.items():
-                cleaned_key = self.clean_namespace(key) if isinstance(key, str) else key
-                cleaned[cleaned_key] = self.clean_all_namespaces(value)
-            return cleaned
-        elif isinstance(data, list):
-            return [self.clean_all_namespaces(item) for item in data]
-        else:
+        if not isinstance(data, (dict, list)):
             return data
 
+        # Caminhada iterativa com pilha explícita, renomeando as chaves
+        # no próprio contêiner: nenhum dict/list intermediário é alocado
+        # e não há um frame Python por nível de profundidade do XML
+        stack = [data]
+
+        while stack:
+            node = stack.pop()
+
+            if isinstance(node, dict):
+                # Congela os pares e reinsere na mesma ordem: preserva a
+                # ordem do documento e, em caso de colisão ("{ns}x" e
+                # "x" no mesmo nível), a última chave vence
+                items = list(node.items())
+                node.clear()
+                for key, value in items:
+                    cleaned_key = (
+                        _strip_ns(key) if isinstance(key, str) else key
+                    )
+                    node[cleaned_key] = value
+                    if isinstance(value, (dict, list)):
+                        stack.append(value)
+            else:
+                for item in node:
+                    if isinstance(item, (dict, list)):
+                        stack.append(item)
+
+        return data
+
     def format_xml_content(self, content: str) -> str:
         """
         Formata conteúdo XML (remove caracteres desnecessários, etc.)
@@ -66,10 +172,10 @@ class XMLFormatter:
             Conteúdo formatado
         """
         # Remove quebras de linha desnecessárias
-        content = re.sub(r"\n\s*\n", "\n", content)
+        content = _RE_DOUBLE_NEWLINE.sub("\n", content)
 
         # Remove espaços extras
-        content = re.sub(r"[ \t]+", " ", content)
+        content = _RE_MULTI_SPACE.sub(" ", content)
 
         # Remove espaços no início e fim das linhas
         lines = [line.strip() for line in content.split("\n")]
@@ -91,10 +197,10 @@ class XMLFormatter:
             return text
 
         # Remove caracteres de controle
-        text = re.sub(r"[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]", "", text)
+        text = _RE_CTRL.sub("", text)
 
         # Normaliza espaços
-        text = re.sub(r"\s+", " ", text).strip()
+        text = _RE_WS.sub(" ", text).strip()
 
         return text
 
@@ -122,7 +228,7 @@ class XMLFormatter:
             if "," in value and "." in value:
                 # Formato: 1.234.567,89
                 if value.rfind(",") > value.rfind("."):
-                    value = value.replace(".", "").replace(",", ".")
+                    value = value.translate(_BR_MONEY)
                 # Formato: 1,234,567.89
                 else:
                     value = value.replace(",", "")
@@ -153,12 +259,12 @@ class XMLFormatter:
             return document
 
         # Remove caracteres não numéricos
-        numbers = re.sub(r"\D", "", document)
+        numbers = document.translate(_KEEP_DIGITS)
 
         if len(numbers) == 11:  # CPF
-            return f"{numbers[:3]}.{numbers[3:6]}.{numbers[6:9]}-{numbers[9:]}"
+            return f"{numbers[:3]}.{numbers[3:6]}.{numbers[6:9]}-{numbers[9:11]}"
         elif len(numbers) == 14:  # CNPJ
-            return f"{numbers[:2]}.{numbers[2:5]}.{numbers[5:8]}/{numbers[8:12]}-{numbers[12:]}"
+            return f"{numbers[:2]}.{numbers[2:5]}.{numbers[5:8]}/{numbers[8:12]}-{numbers[12:14]}"
         else:
             return document  # Retorna original se não reconhecer
 
@@ -175,10 +281,10 @@ class XMLFormatter:
         if not cep:
             return cep
 
-        numbers = re.sub(r"\D", "", cep)
+        numbers = cep.translate(_KEEP_DIGITS)
 
         if len(numbers) == 8:
-            return f"{numbers[:5]}-{numbers[5:]}"
+            return f"{numbers[:5]}-{numbers[5:8]}"
         else:
             return cep
 
@@ -195,12 +301,12 @@ class XMLFormatter:
         if not phone:
             return phone
 
-        numbers = re.sub(r"\D", "", phone)
+        numbers = phone.translate(_KEEP_DIGITS)
 
         if len(numbers) == 11:  # Celular com 9
-            return f"({numbers[:2]}) {numbers[2:7]}-{numbers[7:]}"
+            return f"({numbers[:2]}) {numbers[2:7]}-{numbers[7:11]}"
         elif len(numbers) == 10:  # Fixo ou celular sem 9
-            return f"({numbers[:2]}) {numbers[2:6]}-{numbers[6:]}"
+            return f"({numbers[:2]}) {numbers[2:6]}-{numbers[6:10]}"
         else:
             return phone
 
@@ -217,24 +323,8 @@ class XMLFormatter:
         if not date_string:
             return None
 
-        # Tenta cada padrão conhecido
-        for pattern in self.date_patterns:
-            if re.match(pattern, date_string):
-                try:
-                    # Já está em formato ISO, apenas valida
-                    if "T" in date_string:
-                        # Remove timezone para parsing se presente
-                        clean_date = re.sub(r"[-+]\d{2}:\d{2}$", "", date_string)
-                        datetime.fromisoformat(clean_date)
-                        return date_string  # Retorna original com timezone
-                    else:
-                        # Data simples
-                        datetime.fromisoformat(date_string)
-                        return date_string
-                except ValueError:
-                    continue
-
-        return None
+        # Valida (com cache por string) e retorna o original intacto
+        return date_string if _valid_iso_date(date_string) else None
 
     def beautify_json(self, data: Dict, indent: int = 2) -> str:
         """
@@ -247,6 +337,11 @@ class XMLFormatter:
         Returns:
             JSON formatado como string
         """
+        # Indentação de 2 espaços é o único formato que o backend
+        # rápido (orjson) sabe produzir; outros valores seguem na stdlib
+        if indent == 2:
+            return dump_json_bytes(data, indent=indent).decode("utf-8")
+
         return json.dumps(
             data,
             indent=indent,
@@ -265,7 +360,7 @@ class XMLFormatter:
         Returns:
             JSON minimizado como string
         """
-        return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+        return dump_json_bytes(data, indent=0).decode("utf-8")
 
     def clean_empty_values(
         self,
@@ -288,65 +383,58 @@ class XMLFormatter:
         Returns:
             Dados limpos
         """
-        if isinstance(data, dict):
-            cleaned = {}
-            for key, value in data.items():
-                cleaned_value = self.clean_empty_values(
-                    value,
-                    remove_empty_strings,
-                    remove_none,
-                    remove_empty_dicts,
-                    remove_empty_lists,
-                )
-
-                # Verifica se deve incluir o valor
-                should_include = True
-
-                if remove_none and cleaned_value is None:
-                    should_include = False
-                elif remove_empty_strings and cleaned_value == "":
-                    should_include = False
-                elif remove_empty_dicts and cleaned_value == {}:
-                    should_include = False
-                elif remove_empty_lists and cleaned_value == []:
-                    should_include = False
-
-                if should_include:
-                    cleaned[key] = cleaned_value
-
-            return cleaned
-
-        elif isinstance(data, list):
-            cleaned = []
-            for item in data:
-                cleaned_item = self.clean_empty_values(
-                    item,
-                    remove_empty_strings,
-                    remove_none,
-                    remove_empty_dicts,
-                    remove_empty_lists,
-                )
-
-                # Inclui item se não for um valor vazio que deve ser removido
-                should_include = True
-
-                if remove_none and cleaned_item is None:
-                    should_include = False
-                elif remove_empty_strings and cleaned_item == "":
-                    should_include = False
-                elif remove_empty_dicts and cleaned_item == {}:
-                    should_include = False
-                elif remove_empty_lists and cleaned_item == []:
-                    should_include = False
-
-                if should_include:
-                    cleaned.append(cleaned_item)
-
-            return cleaned
-
-        else:
+        if not isinstance(data, (dict, list)):
             return data
 
+        def _removable(value):
+            # Predicado único de "vazio", avaliado uma vez por nó
+            if value is None:
+                return remove_none
+            if value == "":
+                return remove_empty_strings
+            if value == {}:
+                return remove_empty_dicts
+            if value == []:
+                return remove_empty_lists
+            return False
+
+        # Primeira fase: espelha os contêineres top-down com pilha
+        # explícita (folhas são compartilhadas, não copiadas), guardando
+        # a ordem de criação para a poda
+        result = {} if isinstance(data, dict) else []
+        order = [result]
+        stack = [(data, result)]
+
+        while stack:
+            source, target = stack.pop()
+            values = source.items() if isinstance(source, dict) else enumerate(source)
+            for key, value in values:
+                if isinstance(value, dict):
+                    child = {}
+                elif isinstance(value, list):
+                    child = []
+                else:
+                    child = value
+                if child is not value:
+                    order.append(child)
+                    stack.append((value, child))
+                if isinstance(target, dict):
+                    target[key] = child
+                else:
+                    target.append(child)
+
+        # Segunda fase: poda bottom-up (ordem reversa de criação), de
+        # modo que um dict que fica vazio após limpar os filhos também
+        # seja removido do pai
+        for container in reversed(order):
+            if isinstance(container, dict):
+                for key in [k for k, v in container.items() if _removable(v)]:
+                    del container[key]
+            else:
+                container[:] = [v for v in container if not _removable(v)]
+
+        return result
+
     def get_size_formatted(self, size_bytes: int) -> str:
         """
         Formata tamanho de arquivo em formato legível
@@ -357,14 +445,12 @@ class XMLFormatter:
         Returns:
             Tamanho formatado (ex: "1.5 MB")
         """
-        if size_bytes == 0:
+        if size_bytes <= 0:
             return "0 B"
 
-        size_names = ["B", "KB", "MB", "GB", "TB"]
-        import math
-
-        i = int(math.floor(math.log(size_bytes, 1024)))
-        p = math.pow(1024, i)
-        s = round(size_bytes / p, 2)
+        # (bit_length - 1) // 10 é exatamente floor(log1024(n)) para
+        # inteiros: só um shift e uma divisão float, sem log/pow
+        i = min((size_bytes.bit_length() - 1) // 10, 4)
+        s = round(size_bytes / (1 << (10 * i)), 2)
 
-        return f"{s} {size_names[i]}"
+        return f"{s} {('B', 'KB', 'MB', 'GB', 'TB')[i]}"
@@ -2,11 +2,83 @@
 Módulo de validações
 """
 
+import codecs
+import hashlib
+import os
+import sys
 import xml.etree.ElementTree as ET
+from collections import OrderedDict, deque
+from functools import lru_cache
 from pathlib import Path
 from typing import Union, Dict, List, Optional
 import re
 
+from config.settings import SUPPORTED_XML_EXTENSIONS
+
+# lxml (extra "performance") faz o parse em C via libxml2; sem ele, o
+# ElementTree da stdlib continua atendendo com a mesma semântica
+try:
+    from lxml import etree as _lxml_etree
+
+    _HAS_LXML = True
+except ImportError:
+    _lxml_etree = None
+    _HAS_LXML = False
+
+# Erros de sintaxe dos dois backends, para um único except
+_PARSE_ERRORS = (
+    (ET.ParseError, _lxml_etree.XMLSyntaxError) if _HAS_LXML else (ET.ParseError,)
+)
+
+NFE_NAMESPACE = "http://www.portalfiscal.inf.br/nfe"
+
+# XPath do infNFe compilado uma vez: a expressão vira AST em libxml2 no
+# import e cada avaliação é só a caminhada em C
+if _HAS_LXML:
+    _INF_NFE_XPATH = _lxml_etree.XPath(
+        "//n:infNFe", namespaces={"n": NFE_NAMESPACE}
+    )
+else:
+    _INF_NFE_XPATH = None
+
+# Chave de acesso da NFe: prefixo "NFe" seguido de exatamente 44
+# dígitos — o \d{44} também rejeita chaves com letras, que o antigo
+# par startswith + len deixava passar
+_NFE_ID_RE = re.compile(r"^NFe\d{44}\Z")
+
+# Limite do histórico de erros: deque com maxlen descarta os antigos em
+# O(1) em vez de crescer sem teto em serviços de longa duração
+_MAX_VALIDATION_ERRORS = 1024
+
+# Cache LRU de validação estrutural por hash do conteúdo: pipelines de
+# reprocessamento validam a mesma NFe repetidas vezes, e o hit troca
+# parse + caminhada por um lookup de dict
+_VALIDATION_CACHE_MAX = 1024
+_validation_cache = OrderedDict()
+
+
+def clear_validation_cache():
+    """Esvazia o cache de resultados de validação estrutural"""
+    _validation_cache.clear()
+
+
+@lru_cache(maxsize=4096)
+def _clean_tag(tag: str) -> str:
+    """
+    Remove o namespace de uma tag, com cache e resultado internado
+
+    Tags se repetem para cada irmão no documento, então o strip é pago
+    uma vez por nome; o intern faz os testes de pertencimento no set de
+    obrigatórios compararem ponteiros.
+
+    Args:
+        tag: Nome da tag com ou sem namespace
+
+    Returns:
+        Nome da tag sem namespace (internado)
+    """
+    return sys.intern(tag.partition("}")[2] if tag[:1] == "{" else tag)
+
 
 class XMLValidator:
     """
@@ -19,9 +91,79 @@ class XMLValidator:
             "validations_performed": 0,
             "valid_files": 0,
             "invalid_files": 0,
-            "validation_errors": [],
+            "validation_errors": deque(maxlen=_MAX_VALIDATION_ERRORS),
         }
 
+        # Parser lxml reutilizado entre validações (criá-lo por chamada
+        # custa mais que o parse de documentos pequenos); sem entidades,
+        # rede ou DTD — validação não deve sair do documento — e sem a
+        # coleta de IDs, que só gasta memória aqui
+        if _HAS_LXML:
+            self._lxml_parser = _lxml_etree.XMLParser(
+                resolve_entities=False,
+                no_network=True,
+                load_dtd=False,
+                collect_ids=False,
+            )
+        else:
+            self._lxml_parser = None
+
+    def _fromstring(self, xml_string: str):
+        """
+        Faz parse de uma string XML com o backend disponível
+
+        Args:
+            xml_string: String XML
+
+        Returns:
+            Elemento raiz do documento
+        """
+        if _HAS_LXML:
+            try:
+                return _lxml_etree.fromstring(xml_string, self._lxml_parser)
+            except ValueError:
+                # lxml rejeita str com declaração de encoding; bytes não
+                return _lxml_etree.fromstring(
+                    xml_string.encode("utf-8"), self._lxml_parser
+                )
+        return ET.fromstring(xml_string)
+
+    def _wellformed_file(self, path: Union[str, Path]) -> None:
+        """
+        Verifica a boa-formação de um arquivo em streaming
+
+        iterparse descarta cada elemento assim que ele fecha, então a
+        memória fica proporcional à profundidade do documento e não ao
+        tamanho dele — validar um arquivo gigante não materializa a DOM.
+
+        Args:
+            path: Caminho do arquivo
+
+        Raises:
+            Erro de sintaxe do backend se o XML for malformado
+        """
+        # fsencode entrega o caminho já em bytes ao parser, poupando a
+        # re-codificação str -> bytes que o backend faria por chamada
+        source = os.fsencode(path)
+
+        if _HAS_LXML:
+            for _, elem in _lxml_etree.iterparse(
+                source,
+                events=("end",),
+                resolve_entities=False,
+                no_network=True,
+                load_dtd=False,
+                collect_ids=False,
+            ):
+                elem.clear()
+                parent = elem.getparent()
+                if parent is not None:
+                    while elem.getprevious() is not None:
+                        del parent[0]
+        else:
+            for _, elem in ET.iterparse(source):
+                elem.clear()
+
     def is_valid_xml_string(self, xml_string: str) -> bool:
         """
         Valida se string é XML válido
@@ -35,10 +177,10 @@ class XMLValidator:
         self.stats["validations_performed"] += 1
 
         try:
-            ET.fromstring(xml_string)
+            self._fromstring(xml_string)
             self.stats["valid_files"] += 1
             return True
-        except ET.ParseError as e:
+        except _PARSE_ERRORS as e:
             self.stats["invalid_files"] += 1
             self.stats["validation_errors"].append(str(e))
             return False
@@ -60,10 +202,11 @@ class XMLValidator:
         self.stats["validations_performed"] += 1
 
         try:
-            path = Path(file_path)
+            path = os.fspath(file_path)
 
-            # Verifica se arquivo existe
-            if not path.exists():
+            # Verifica se arquivo existe (os.path direto: sem a camada
+            # de objetos do pathlib no caminho quente do lote)
+            if not os.path.isfile(path):
                 error_msg = f"Arquivo não encontrado: {file_path}"
                 self.stats["validation_errors"].append(error_msg)
                 self.stats["invalid_files"] += 1
@@ -76,12 +219,12 @@ class XMLValidator:
                 self.stats["invalid_files"] += 1
                 return False
 
-            # Tenta fazer parse do arquivo
-            ET.parse(str(path))
+            # Verifica a boa-formação em streaming, sem montar a árvore
+            self._wellformed_file(path)
             self.stats["valid_files"] += 1
             return True
 
-        except ET.ParseError as e:
+        except _PARSE_ERRORS as e:
             error_msg = f"XML inválido em {file_path}: {str(e)}"
             self.stats["validation_errors"].append(error_msg)
             self.stats["invalid_files"] += 1
@@ -92,6 +235,73 @@ class XMLValidator:
             self.stats["invalid_files"] += 1
             return False
 
+    def _validate_one(self, path: str) -> bool:
+        """
+        Valida um arquivo sem tocar nas estatísticas compartilhadas
+
+        Usado pelos workers de validate_xml_files: o parse (que libera o
+        GIL no backend lxml) roda em paralelo e as estatísticas são
+        agregadas depois, em uma thread só.
+
+        Args:
+            path: Caminho do arquivo (string)
+
+        Returns:
+            True se o arquivo é um XML válido
+        """
+        try:
+            if not os.path.isfile(path):
+                return False
+            if not self.has_xml_extension(path):
+                return False
+            self._wellformed_file(path)
+            return True
+        except Exception:
+            return False
+
+    def validate_xml_files(
+        self, paths, max_workers: Optional[int] = None
+    ) -> Dict[str, bool]:
+        """
+        Valida vários arquivos XML com leituras/parses sobrepostos
+
+        Cada validação bloqueia em read + parse; com várias em voo ao
+        mesmo tempo a latência de I/O por arquivo deixa de ser o gargalo.
+        Lotes pequenos seguem sequenciais.
+
+        Args:
+            paths: Iterável de caminhos de arquivos
+            max_workers: Número de threads (default: min(32, nº de itens))
+
+        Returns:
+            Dict com resultados {caminho: válido}
+        """
+        paths = [os.fspath(path) for path in paths]
+
+        if max_workers is None:
+            max_workers = min(32, len(paths) or 1)
+
+        if max_workers <= 1 or len(paths) < 4:
+            results = {path: self._validate_one(path) for path in paths}
+        else:
+            from concurrent.futures import ThreadPoolExecutor
+
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = dict(zip(paths, executor.map(self._validate_one, paths)))
+
+        # Agrega as estatísticas de uma vez, fora das threads
+        valid_count = sum(results.values())
+        self.stats["validations_performed"] += len(results)
+        self.stats["valid_files"] += valid_count
+        self.stats["invalid_files"] += len(results) - valid_count
+        for path, valid in results.items():
+            if not valid:
+                self.stats["validation_errors"].append(
+                    f"Arquivo XML inválido: {path}"
+                )
+
+        return results
+
     def has_xml_extension(self, file_path: Union[str, Path]) -> bool:
         """
         Verifica se arquivo tem extensão XML
@@ -102,8 +312,8 @@ class XMLValidator:
         Returns:
             True se tem extensão XML
         """
-        xml_extensions = [".xml", ".nfe", ".cte", ".mdfe"]
-        return Path(file_path).suffix.lower() in xml_extensions
+        ext = os.path.splitext(os.fspath(file_path))[1].lower()
+        return ext in SUPPORTED_XML_EXTENSIONS
 
     def check_xml_encoding(self, file_path: Union[str, Path]) -> Optional[str]:
         """
@@ -120,21 +330,24 @@ class XMLValidator:
                 # Lê primeiros bytes para detectar encoding
                 first_bytes = file.read(100)
 
-            # Converte para string tentando UTF-8
-            try:
-                header = first_bytes.decode("utf-8")
-            except UnicodeDecodeError:
-                try:
-                    header = first_bytes.decode("latin-1")
-                except UnicodeDecodeError:
-                    return None
-
-            # Procura declaração de encoding
-            encoding_match = re.search(
-                r'encoding=["\']([^"\']+)["\']', header, re.IGNORECASE
-            )
-            if encoding_match:
-                return encoding_match.group(1).lower()
+            # BOM resolve sem olhar a declaração: comparações O(1)
+            if first_bytes.startswith(codecs.BOM_UTF8):
+                return "utf-8-sig"
+            if first_bytes.startswith(
+                (codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)
+            ):
+                return "utf-16"
+
+            # Procura a declaração nos bytes com find puro (memmem em C):
+            # a declaração XML é ASCII e minúscula por especificação
+            idx = first_bytes.find(b"encoding=")
+            if idx >= 0:
+                quote = first_bytes[idx + 9 : idx + 10]
+                if quote in (b'"', b"'"):
+                    end = first_bytes.find(quote, idx + 10)
+                    if end > idx + 10:
+                        value = first_bytes[idx + 10 : end]
+                        return value.decode("ascii", "ignore").lower()
 
             # Default para UTF-8 se não encontrar
             return "utf-8"
@@ -142,19 +355,53 @@ class XMLValidator:
         except Exception:
             return None
 
+    def validate_parsed(self, root, required_elements: List[str] = None) -> Dict:
+        """
+        Valida a estrutura de um documento já parseado
+
+        Permite que o conversor reutilize a árvore que acabou de montar
+        em vez de pagar um segundo parse só para validar.
+
+        Args:
+            root: Elemento raiz já parseado
+            required_elements: Lista de elementos obrigatórios
+
+        Returns:
+            Dict com resultado da validação
+        """
+        return self.validate_xml_structure(None, required_elements, root=root)
+
     def validate_xml_structure(
-        self, xml_string: str, required_elements: List[str] = None
+        self,
+        xml_string: Optional[str],
+        required_elements: List[str] = None,
+        root=None,
     ) -> Dict:
         """
         Valida estrutura específica do XML
 
         Args:
-            xml_string: String XML
+            xml_string: String XML (ignorada se root for informado)
             required_elements: Lista de elementos obrigatórios
+            root: Elemento raiz já parseado (evita o re-parse)
 
         Returns:
             Dict com resultado da validação
         """
+        # Cache por conteúdo só quando vamos parsear a string nós mesmos
+        cache_key = None
+        if root is None and xml_string is not None:
+            digest = hashlib.blake2b(
+                xml_string.encode("utf-8"), digest_size=16
+            ).digest()
+            cache_key = (digest, tuple(required_elements or ()))
+            cached = _validation_cache.get(cache_key)
+            if cached is not None:
+                _validation_cache.move_to_end(cache_key)
+                # Cópia rasa: chamadores (ex.: validate_nfe_structure)
+                # anexam chaves ao resultado
+                return dict(cached)
+
         result = {
             "valid": False,
             "root_element": None,
@@ -166,7 +413,8 @@ class XMLValidator:
         }
 
         try:
-            root = ET.fromstring(xml_string)
+            if root is None:
+                root = self._fromstring(xml_string)
             result["root_element"] = self._clean_namespace(root.tag)
             result["valid"] = True
 
@@ -174,15 +422,37 @@ class XMLValidator:
             if "}" in root.tag:
                 result["namespace"] = root.tag.split("}")[0][1:]
 
-            # Conta elementos e atributos
-            result["total_elements"] = len(list(root.iter()))
-            result["attributes_count"] = sum(len(elem.attrib) for elem in root.iter())
-
-            # Verifica elementos obrigatórios
-            if required_elements:
-                found_elements = [
-                    self._clean_namespace(elem.tag) for elem in root.iter()
-                ]
+            # Tags encontradas só interessam se há obrigatórios a checar
+            found_elements = set() if required_elements else None
+
+            # O ramo XPath depende da árvore ser lxml, não só do lxml estar
+            # instalado — validate_parsed pode receber uma raiz da stdlib
+            if _HAS_LXML and isinstance(root, _lxml_etree._Element):
+                # Contagens inteiras em libxml2, sem iterar em Python
+                result["total_elements"] = int(root.xpath("count(//*)"))
+                result["attributes_count"] = int(root.xpath("count(//@*)"))
+                if found_elements is not None:
+                    for elem in root.iter():
+                        tag = elem.tag
+                        if isinstance(tag, str):
+                            found_elements.add(_clean_tag(tag))
+            else:
+                # Uma única passada acumula contagens e tags vistas
+                total_elements = 0
+                attributes_count = 0
+                for elem in root.iter():
+                    tag = elem.tag
+                    if not isinstance(tag, str):
+                        continue  # comentários/PIs não contam
+                    total_elements += 1
+                    attributes_count += len(elem.attrib)
+                    if found_elements is not None:
+                        found_elements.add(_clean_tag(tag))
+                result["total_elements"] = total_elements
+                result["attributes_count"] = attributes_count
+
+            # Verifica elementos obrigatórios (set: pertencimento O(1))
+            if found_elements is not None:
                 result["required_elements_found"] = [
                     elem for elem in required_elements if elem in found_elements
                 ]
@@ -190,17 +460,25 @@ class XMLValidator:
                     elem for elem in required_elements if elem not in found_elements
                 ]
 
-        except ET.ParseError as e:
+        except _PARSE_ERRORS as e:
             result["error"] = str(e)
 
+        if cache_key is not None:
+            _validation_cache[cache_key] = dict(result)
+            if len(_validation_cache) > _VALIDATION_CACHE_MAX:
+                _validation_cache.popitem(last=False)
+
         return result
 
-    def validate_nfe_structure(self, xml_string: str) -> Dict:
+    def validate_nfe_structure(
+        self, xml_string: Optional[str] = None, root=None
+    ) -> Dict:
         """
         Validação específica para NFe brasileira
 
         Args:
             xml_string: String XML da NFe
+            root: Elemento raiz já parseado (evita o re-parse)
 
         Returns:
             Dict com resultado da validação NFe
@@ -219,25 +497,73 @@ class XMLValidator:
             "protNFe",
         ]
 
-        result = self.validate_xml_structure(xml_string, nfe_required_elements)
+        # Sniff barato nos primeiros bytes: quem não menciona o
+        # namespace nem as tags de NFe no cabeçalho é rejeitado sem
+        # pagar o parse completo do documento
+        if root is None and xml_string is not None:
+            head = xml_string[:4096]
+            if (
+                "portalfiscal.inf.br/nfe" not in head
+                and "nfeProc" not in head
+                and "<NFe" not in head
+            ):
+                return {
+                    "valid": False,
+                    "root_element": None,
+                    "namespace": None,
+                    "required_elements_found": [],
+                    "missing_elements": list(nfe_required_elements),
+                    "total_elements": 0,
+                    "attributes_count": 0,
+                    "is_nfe": False,
+                    "correct_namespace": False,
+                    "has_nfe_key": False,
+                    "nfe_key": None,
+                }
+
+        # Parse único: a mesma árvore alimenta a validação estrutural e
+        # as checagens específicas de NFe abaixo
+        if root is None and xml_string is not None:
+            try:
+                root = self._fromstring(xml_string)
+            except _PARSE_ERRORS as e:
+                result = self.validate_xml_structure(xml_string, nfe_required_elements)
+                result["nfe_validation_error"] = str(e)
+                return result
+
+        result = self.validate_xml_structure(
+            xml_string, nfe_required_elements, root=root
+        )
 
         # Validações específicas da NFe
         try:
-            root = ET.fromstring(xml_string)
-
             # Verifica se é realmente uma NFe
             root_tag = self._clean_namespace(root.tag)
             result["is_nfe"] = root_tag in ["nfeProc", "NFe"]
 
             # Verifica namespace da NFe
-            expected_namespace = "http://www.portalfiscal.inf.br/nfe"
-            result["correct_namespace"] = expected_namespace in xml_string
-
-            # Verifica chave da NFe
-            nfe_element = root.find(".//{http://www.portalfiscal.inf.br/nfe}infNFe")
+            expected_namespace = NFE_NAMESPACE
+            if xml_string is not None:
+                # A declaração do namespace vive no elemento raiz, então
+                # olhar o cabeçalho basta — O(header), não O(documento)
+                result["correct_namespace"] = expected_namespace in xml_string[:4096]
+            else:
+                result["correct_namespace"] = expected_namespace in root.tag
+
+            # Verifica chave da NFe (XPath pré-compilado quando a árvore
+            # é lxml; árvores ElementTree seguem pelo find)
+            if _INF_NFE_XPATH is not None and isinstance(
+                root, _lxml_etree._Element
+            ):
+                matches = _INF_NFE_XPATH(root)
+                nfe_element = matches[0] if matches else None
+            else:
+                nfe_element = root.find(
+                    ".//{http://www.portalfiscal.inf.br/nfe}infNFe"
+                )
             if nfe_element is not None:
                 nfe_id = nfe_element.get("Id", "")
-                result["has_nfe_key"] = nfe_id.startswith("NFe") and len(nfe_id) == 47
+                result["has_nfe_key"] = _NFE_ID_RE.match(nfe_id) is not None
                 result["nfe_key"] = nfe_id
             else:
                 result["has_nfe_key"] = False
@@ -262,7 +588,7 @@ class XMLValidator:
             True se arquivo está dentro do limite
         """
         try:
-            size_bytes = Path(file_path).stat().st_size
+            size_bytes = os.stat(os.fspath(file_path)).st_size
             size_mb = size_bytes / (1024 * 1024)
 
             if size_mb > max_size_mb:
@@ -289,7 +615,7 @@ class XMLValidator:
         Returns:
             Nome da tag sem namespace
         """
-        return re.sub(r"\{.*\}", "", tag)
+        return _clean_tag(tag)
 
     def get_stats(self) -> Dict:
         """
@@ -298,7 +624,10 @@ class XMLValidator:
         Returns:
             Dict com estatísticas
         """
-        return self.stats.copy()
+        stats = self.stats.copy()
+        # Exporta o histórico como lista, preservando o formato antigo
+        stats["validation_errors"] = list(stats["validation_errors"])
+        return stats
 
     def reset_stats(self):
         """Reset das estatísticas"""
@@ -306,7 +635,7 @@ class XMLValidator:
             "validations_performed": 0,
             "valid_files": 0,
             "invalid_files": 0,
-            "validation_errors": [],
+            "validation_errors": deque(maxlen=_MAX_VALIDATION_ERRORS),
         }
 
     def get_last_errors(self, count: int = 5) -> List[str]:
@@ -319,8 +648,5 @@ class XMLValidator:
         Returns:
             Lista com últimos erros
         """
-        return (
-            self.stats["validation_errors"][-count:]
-            if self.stats["validation_errors"]
-            else []
-        )
+        errors = self.stats["validation_errors"]
+        return list(errors)[-count:] if errors else []
@@ -16,10 +16,10 @@ from src.utils.formatters import XMLFormatter
 class TestXMLToJSONConverter(unittest.TestCase):
     """Testes para a classe XMLToJSONConverter"""
 
-    def setUp(self):
-        """Setup executado antes de cada teste"""
-        self.converter = XMLToJSONConverter()
-        self.sample_xml = """<?xml version="1.0" encoding="UTF-8"?>
+    @classmethod
+    def setUpClass(cls):
+        """Fixtures imutáveis criadas uma vez para toda a classe"""
+        cls.sample_xml = """<?xml version="1.0" encoding="UTF-8"?>
         <root>
             <person id="1">
                 <name>João Silva</name>
@@ -32,7 +32,7 @@ class TestXMLToJSONConverter(unittest.TestCase):
             </person>
         </root>"""
 
-        self.nfe_sample_xml = """<?xml version="1.0" encoding="utf-8"?>
+        cls.nfe_sample_xml = """<?xml version="1.0" encoding="utf-8"?>
         <nfeProc xmlns="http://www.portalfiscal.inf.br/nfe" versao="4.00">
             <NFe>
                 <infNFe versao="4.00" Id="NFe12345678901234567890123456789012345678901234">
@@ -55,6 +55,10 @@ class TestXMLToJSONConverter(unittest.TestCase):
             </NFe>
         </nfeProc>"""
 
+    def setUp(self):
+        """Setup executado antes de cada teste"""
+        self.converter = XMLToJSONConverter()
+
     def test_convert_string_basic(self):
         """Testa conversão básica de string XML"""
         result = self.converter.convert_string(self.sample_xml)
@@ -133,28 +137,21 @@ class TestXMLToJSONConverter(unittest.TestCase):
 
     def test_convert_file_success(self):
         """Testa conversão de arquivo com sucesso"""
-        with tempfile.NamedTemporaryFile(
-            mode="w", suffix=".xml", delete=False
-        ) as temp_xml:
-            temp_xml.write(self.sample_xml)
-            temp_xml.flush()
-
-            temp_json = temp_xml.name.replace(".xml", ".json")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_xml = Path(temp_dir) / "entrada.xml"
+            temp_json = Path(temp_dir) / "saida.json"
+            temp_xml.write_text(self.sample_xml, encoding="utf-8")
 
-            result = self.converter.convert_file(temp_xml.name, temp_json)
+            result = self.converter.convert_file(temp_xml, temp_json)
 
             self.assertIsNotNone(result)
-            self.assertTrue(Path(temp_json).exists())
+            self.assertTrue(temp_json.exists())
 
             # Verifica conteúdo do arquivo JSON
             with open(temp_json, "r", encoding="utf-8") as f:
                 json_content = json.load(f)
                 self.assertEqual(json_content, result)
 
-            # Cleanup
-            Path(temp_xml.name).unlink()
-            Path(temp_json).unlink()
-
     def test_convert_file_not_found(self):
         """Testa conversão com arquivo inexistente"""
         result = self.converter.convert_file("arquivo_inexistente.xml")
@@ -165,9 +162,10 @@ class TestXMLToJSONConverter(unittest.TestCase):
         with tempfile.TemporaryDirectory() as temp_dir:
             temp_path = Path(temp_dir)
 
-            # Cria arquivos XML de teste
+            # Cria arquivos suficientes para acionar o caminho paralelo
+            # do convert_batch (>= _MIN_FILES_FOR_POOL)
             xml_files = []
-            for i in range(3):
+            for i in range(5):
                 xml_file = temp_path / f"test_{i}.xml"
                 with open(xml_file, "w", encoding="utf-8") as f:
                     f.write(self.sample_xml)
@@ -176,7 +174,7 @@ class TestXMLToJSONConverter(unittest.TestCase):
             # Converte em lote
             results = self.converter.convert_batch(temp_path)
 
-            self.assertEqual(len(results), 3)
+            self.assertEqual(len(results), 5)
             self.assertTrue(all(results.values()))
 
             # Verifica se arquivos JSON foram criados
@@ -208,11 +206,15 @@ class TestXMLToJSONConverter(unittest.TestCase):
 class TestXMLValidator(unittest.TestCase):
     """Testes para a classe XMLValidator"""
 
+    @classmethod
+    def setUpClass(cls):
+        """Fixtures imutáveis criadas uma vez para toda a classe"""
+        cls.valid_xml = """<?xml version="1.0"?><root><item>test</item></root>"""
+        cls.invalid_xml = """<?xml version="1.0"?><root><unclosed>"""
+
     def setUp(self):
         """Setup executado antes de cada teste"""
         self.validator = XMLValidator()
-        self.valid_xml = """<?xml version="1.0"?><root><item>test</item></root>"""
-        self.invalid_xml = """<?xml version="1.0"?><root><unclosed>"""
 
     def test_valid_xml_string(self):
         """Testa validação de XML válido"""